@@ -44,7 +44,10 @@ def notnull(input):
     boolean ndarray or boolean
     '''
     if isinstance(input, np.ndarray):
-        return -isnull(input)
+        if input.dtype.kind in ('O', 'S'):
+            return -isnull(input)
+        # rather than negating isnull, which already negated isfinite
+        return np.isfinite(input)
     else:
         return not tseries.checknull(input)
 
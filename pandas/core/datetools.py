@@ -38,9 +38,35 @@ def to_datetime(arg):
 def normalize_date(dt):
     return datetime(dt.year, dt.month, dt.day)
 
+_monthrangeCache = {}
+
+def _monthrange(year, month):
+    """
+    Memoized calendar.monthrange, the offsets below look up the same
+    months over and over when generating ranges
+    """
+    key = (year, month)
+    try:
+        return _monthrangeCache[key]
+    except KeyError:
+        result = _monthrangeCache[key] = calendar.monthrange(year, month)
+        return result
+
 #-------------------------------------------------------------------------------
 # DateOffset
 
+_fixedLengthKeys = set(['weeks', 'days', 'hours', 'minutes', 'seconds',
+                        'microseconds'])
+
+def _isFixedLength(kwds):
+    """
+    Whether relativedelta(**kwds) always moves a date by the same amount
+    """
+    for k, v in kwds.iteritems():
+        if k not in _fixedLengthKeys or not isinstance(v, (int, long)):
+            return False
+    return True
+
 class DateOffset(object):
     """
     Standard kind of date increment used for a date range.
@@ -93,12 +119,20 @@ class DateOffset(object):
 
     def apply(self, other):
         if len(self.kwds) > 0:
+            # Fixed-length steps add up, so take them all at once. Months,
+            # years and absolute fields (day=31, ...) do not, since each
+            # step is clipped to its month, so those are applied n times
+            if _isFixedLength(self.kwds):
+                kwds = dict((k, v * self.n) for k, v in self.kwds.iteritems())
+                return other + relativedelta(**kwds)
+
+            delta = relativedelta(**self.kwds)
             if self.n > 0:
                 for i in xrange(self.n):
-                    other = other + relativedelta(**self.kwds)
+                    other = other + delta
             else:
                 for i in xrange(-self.n):
-                    other = other - relativedelta(**self.kwds)
+                    other = other - delta
             return other
         else:
             return other + timedelta(self.n)
@@ -110,11 +144,22 @@ class DateOffset(object):
         return self.__class__(self.n, **self.kwds)
 
     def _params(self):
-        attrs = sorted((item for item in self.__dict__.iteritems()
-                        if item[0] != 'kwds'))
-        params = tuple([str(self.__class__)] + attrs)
+        # offsets are not modified once built, so this is worked out once
+        # for hashing and comparisons
+        params = self.__dict__.get('_cachedParams')
+        if params is None:
+            attrs = sorted((item for item in self.__dict__.iteritems()
+                            if item[0] != 'kwds'
+                            and not item[0].startswith('_')))
+            params = tuple([str(self.__class__)] + attrs)
+            self._cachedParams = params
         return params
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop('_cachedParams', None)
+        return state
+
     def __repr__(self):
         className = getattr(self, '_outputName', type(self).__name__)
         exclude = set(['n', 'inc'])
@@ -138,6 +183,8 @@ class DateOffset(object):
         return out
 
     def __eq__(self, other):
+        if type(self) is not type(other):
+            return False
         return self._params() == other._params()
 
     def __hash__(self):
@@ -173,13 +220,18 @@ class DateOffset(object):
     def __neg__(self):
         return self.__class__(-self.n, **self.kwds)
 
+    def _unit(self):
+        if self.n == 1:
+            return self
+        return self.__class__(1, **self.kwds)
+
     def rollback(self, someDate):
         """Roll provided date backward to next offset only if not on offset"""
         if self._normalizeFirst:
             someDate = normalize_date(someDate)
 
         if not self.onOffset(someDate):
-            someDate = someDate - self.__class__(1, **self.kwds)
+            someDate = someDate - self._unit()
         return someDate
 
     def rollforward(self, someDate):
@@ -188,7 +240,7 @@ class DateOffset(object):
             someDate = normalize_date(someDate)
 
         if not self.onOffset(someDate):
-            someDate = someDate + self.__class__(1, **self.kwds)
+            someDate = someDate + self._unit()
         return someDate
 
     def onOffset(self, someDate):
@@ -198,6 +250,25 @@ class DateOffset(object):
         return someDate == ((someDate + self) - self)
 
 
+def _bdaySteps(direction):
+    """
+    For each weekday, the number of days to each of the next 5 business
+    days in the given direction (1 forward, -1 back)
+    """
+    table = []
+    for weekday in range(7):
+        steps = []
+        days = 0
+        while len(steps) < 5:
+            days += 1
+            if (weekday + direction * days) % 7 < 5:
+                steps.append(days)
+        table.append(steps)
+    return table
+
+_bdayForward = _bdaySteps(1)
+_bdayBackward = _bdaySteps(-1)
+
 class BDay(DateOffset):
     """
     DateOffset subclass representing possibly n business days
@@ -238,13 +309,18 @@ class BDay(DateOffset):
             if n == 0 and other.weekday() > 4:
                 n = 1
 
-            result = other
-
-            while n != 0:
-                k = n // abs(n)
-                result = result + timedelta(k)
-                if result.weekday() < 5:
-                    n -= k
+            # every 7 days hold 5 business days, so step whole weeks and
+            # look up the days to the remaining business day
+            if n > 0:
+                weeks, k = divmod(n - 1, 5)
+                days = 7 * weeks + _bdayForward[other.weekday()][k]
+                result = other + timedelta(days)
+            elif n < 0:
+                weeks, k = divmod(-n - 1, 5)
+                days = 7 * weeks + _bdayBackward[other.weekday()][k]
+                result = other - timedelta(days)
+            else:
+                result = other
 
             if self.normalize:
                 result = datetime(result.year, result.month, result.day)
@@ -264,6 +340,9 @@ class BDay(DateOffset):
     def onOffset(cls, someDate):
         return someDate.weekday() < 5
 
+# shared by the business period ends that land on a weekend, so they do not
+# build a throwaway BDay on every call
+_prevBDay = BDay(-1)
 
 class MonthEnd(DateOffset):
     _normalizeFirst = True
@@ -271,18 +350,16 @@ class MonthEnd(DateOffset):
 
     def apply(self, other):
         n = self.n
-        _, nDaysInMonth = calendar.monthrange(other.year, other.month)
-        if other.day != nDaysInMonth:
-            other = other + relativedelta(months=-1, day=31)
-            if n <= 0:
-                n = n + 1
+        _, nDaysInMonth = _monthrange(other.year, other.month)
+        if other.day != nDaysInMonth and n > 0:
+            # the current month end counts as the first step
+            n = n - 1
         other = other + relativedelta(months=n, day=31)
         return other
 
     @classmethod
     def onOffset(cls, someDate):
-        __junk, nDaysInMonth = calendar.monthrange(someDate.year,
-                                                   someDate.month)
+        __junk, nDaysInMonth = _monthrange(someDate.year, someDate.month)
         return someDate.day == nDaysInMonth
 
 class BMonthEnd(DateOffset):
@@ -296,7 +373,7 @@ class BMonthEnd(DateOffset):
     def apply(self, other):
         n = self.n
 
-        wkday, nDaysInMonth = calendar.monthrange(other.year, other.month)
+        wkday, nDaysInMonth = _monthrange(other.year, other.month)
         lastBDay = nDaysInMonth - max(((wkday + nDaysInMonth - 1) % 7) - 4, 0)
 
         if n > 0 and not other.day >= lastBDay:
@@ -306,7 +383,7 @@ class BMonthEnd(DateOffset):
         other = other + relativedelta(months=n, day=31)
 
         if other.weekday() > 4:
-            other = other - BDay()
+            other = _prevBDay.apply(other)
         return other
 
 
@@ -341,22 +418,12 @@ class Week(DateOffset):
         if self.weekday is None:
             return other + self.n * self.inc
 
-        if self.n > 0:
-            k = self.n
-            otherDay = other.weekday()
-            if otherDay != self.weekday:
-                other = other + timedelta((self.weekday - otherDay) % 7)
-                k = k - 1
-            for i in xrange(k):
-                other = other + self.inc
-        else:
-            k = self.n
-            otherDay = other.weekday()
-            if otherDay != self.weekday:
-                other = other + timedelta((self.weekday - otherDay) % 7)
-            for i in xrange(-k):
-                other = other - self.inc
-        return other
+        # move up to the weekday first, which counts as a step going forward
+        k = self.n
+        days = (self.weekday - other.weekday()) % 7
+        if days and k > 0:
+            k = k - 1
+        return other + timedelta(days=days, weeks=k)
 
     def onOffset(self, someDate):
         return someDate.weekday() == self.weekday
@@ -388,7 +455,7 @@ class BQuarterEnd(DateOffset):
     def apply(self, other):
         n = self.n
 
-        wkday, nDaysInMonth = calendar.monthrange(other.year, other.month)
+        wkday, nDaysInMonth = _monthrange(other.year, other.month)
         lastBDay = nDaysInMonth - max(((wkday + nDaysInMonth - 1) % 7) - 4, 0)
 
         monthsToGo = 3 - ((other.month - self.startingMonth) % 3)
@@ -403,7 +470,7 @@ class BQuarterEnd(DateOffset):
         other = other + relativedelta(months=monthsToGo + 3*n, day=31)
 
         if other.weekday() > 4:
-            other = other - BDay()
+            other = _prevBDay.apply(other)
 
         return other
 
@@ -430,7 +497,7 @@ class BYearEnd(DateOffset):
         if self._normalizeFirst:
             other = normalize_date(other)
 
-        wkday, nDaysInMonth = calendar.monthrange(other.year, self.month)
+        wkday, nDaysInMonth = _monthrange(other.year, self.month)
         lastBDay = nDaysInMonth - max(((wkday + nDaysInMonth - 1) % 7) - 4, 0)
 
         years = n
@@ -445,11 +512,11 @@ class BYearEnd(DateOffset):
 
         other = other + relativedelta(years=years)
 
-        _, days_in_month = calendar.monthrange(other.year, self.month)
+        _, days_in_month = _monthrange(other.year, self.month)
         result = datetime(other.year, self.month, days_in_month)
 
         if result.weekday() > 4:
-            result = result - BDay()
+            result = _prevBDay.apply(result)
 
         return result
 
@@ -493,19 +560,30 @@ class YearBegin(DateOffset):
 
 class Tick(DateOffset):
     _normalizeFirst = False
-    _delta = None
     _inc = timedelta(microseconds=1000)
 
+    def __init__(self, n=1, **kwds):
+        self.n = int(n)
+        self.kwds = kwds
+        self._delta = self.n * self._inc
+
+    def __getstate__(self):
+        state = DateOffset.__getstate__(self)
+        state.pop('_delta', None)
+        return state
+
+    def __setstate__(self, state):
+        # older pickles may not carry _delta, so always work it out again
+        self.__dict__.update(state)
+        self._delta = self.n * self._inc
+
     @property
     def delta(self):
-        if self._delta is None:
-            self._delta = self.n * self._inc
-
         return self._delta
 
     def apply(self, other):
         if isinstance(other, (datetime, timedelta)):
-            return other + self.delta
+            return other + self._delta
         elif isinstance(other, type(self)):
             return type(self)(self.n + other.n)
 
@@ -577,12 +655,38 @@ def inferTimeRule(index):
         raise Exception('Need at least three dates to infer time rule!')
 
     first, second, third = index[:3]
+
+    # Try the rules whose spacing matches the first gap before the rest
+    for rule in _likelyRules((second - first).days):
+        offset = _offsetMap[rule]
+        if second == (first + offset) and third == (second + offset):
+            return rule
+
     for rule, offset in _offsetMap.iteritems():
         if second == (first + offset) and third == (second + offset):
             return rule
 
     raise Exception('Could not infer time rule from data!')
 
+_weeklyRules = ['W@MON', 'W@TUE', 'W@WED', 'W@THU', 'W@FRI']
+_quarterlyRules = ['Q@JAN', 'Q@FEB', 'Q@MAR']
+_annualRules = [rule for rule in _offsetMap if rule.startswith('A@')]
+
+def _likelyRules(gap):
+    """
+    Rules likely to produce consecutive dates gap days apart
+    """
+    if gap < 7:
+        return ['WEEKDAY']
+    elif gap == 7:
+        return _weeklyRules
+    elif gap < 40:
+        return ['EOM']
+    elif gap < 100:
+        return _quarterlyRules
+    else:
+        return _annualRules
+
 def getOffset(name):
     """
     Return DateOffset object associated with rule name
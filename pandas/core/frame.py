@@ -542,15 +542,20 @@ class DataFrame(Picklable, Groupable):
                 f.write(joined_cols)
             f.write('\n')
 
-        for idx in self.index:
+        # the series share the frame's index, so read them by position and
+        # find the missing values a column at a time
+        values = [series[col].values for col in cols]
+        masks = [isnull(vals) for vals in values]
+        columns = zip(values, masks)
+
+        for i, idx in enumerate(self.index):
             if index:
                 f.write(str(idx))
-            for col in cols:
-                val = series[col].get(idx)
-                if isnull(val):
+            for vals, mask in columns:
+                if mask[i]:
                     val = nanRep
                 else:
-                    val = str(val)
+                    val = str(vals[i])
                 f.write(',%s' % val)
             f.write('\n')
 
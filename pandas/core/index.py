@@ -61,10 +61,12 @@ class Index(np.ndarray):
 
     @property
     def indexMap(self):
-        if not hasattr(self, '_cache_indexMap'):
+        # read on every label lookup, so go straight for the cached dict
+        try:
+            return self._cache_indexMap
+        except AttributeError:
             self._cache_indexMap = map_indices(self)
-
-        return self._cache_indexMap
+            return self._cache_indexMap
 
     @property
     def _allDates(self):
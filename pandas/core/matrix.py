@@ -118,6 +118,8 @@ class DataMatrix(DataFrame):
         if objects is not None and isinstance(objects, dict):
             objectDict.update(objects)
 
+        # The block's dtype and column order are only known once every input
+        # has been classified, so aligning and filling are separate passes
         valueDict = {}
         for k, v in data.iteritems():
             if isinstance(v, Series):
@@ -170,6 +172,9 @@ class DataMatrix(DataFrame):
                 else:
                     objects = new_objects
 
+        # The series are already aligned, so this is one copy per column into
+        # the preallocated block. Stacking them (column_stack, or filling the
+        # transpose and copying) does the same copies plus a dtype pass.
         values = np.empty((len(index), len(columns)), dtype=dtype)
 
         for i, col in enumerate(columns):
@@ -243,23 +248,20 @@ class DataMatrix(DataFrame):
         fillVec, mask = tseries.getMergeVec(self[on],
                                             other.index.indexMap)
 
+        # One gather per block; the gathered blocks are wrapped as they are
+        # rather than split into a dict of Series and rebuilt
         tmpMatrix = other.values.take(fillVec, axis=0)
         tmpMatrix[-mask] = NaN
 
-        seriesDict = dict((col, tmpMatrix[:, j])
-                           for j, col in enumerate(other.columns))
-
+        objects = None
         if getattr(other, 'objects'):
-            objects = other.objects
-
-            tmpMat = objects.values.take(fillVec, axis=0)
+            tmpMat = other.objects.values.take(fillVec, axis=0)
             tmpMat[-mask] = NaN
-            objDict = dict((col, tmpMat[:, j])
-                           for j, col in enumerate(objects.columns))
+            objects = DataMatrix(tmpMat, index=self.index,
+                                 columns=other.objects.columns)
 
-            seriesDict.update(objDict)
-
-        filledFrame = DataFrame(data=seriesDict, index=self.index)
+        filledFrame = DataMatrix(tmpMatrix, index=self.index,
+                                 columns=other.columns, objects=objects)
 
         return self.join(filledFrame, how='left')
 
@@ -273,6 +275,12 @@ class DataMatrix(DataFrame):
         if len(self.index) == 0:
             return DataMatrix(index=index, columns=self.columns)
 
+        if self.index.equals(index):
+            # Same labels in the same order, the gather would only be a copy
+            result = self.copy()
+            result.index = index
+            return result
+
         indexer, mask = common.get_indexer(self.index, index, method)
         mat = self.values.take(indexer, axis=0)
 
@@ -313,6 +321,8 @@ class DataMatrix(DataFrame):
             return DataMatrix(index=self.index, columns=columns,
                               objects=objects)
 
+        # take writes every output column once; only the missing ones are
+        # written a second time, with NaN
         indexer, mask = common.get_indexer(self.columns, columns, None)
         mat = self.values.take(indexer, axis=1)
 
@@ -370,10 +380,8 @@ class DataMatrix(DataFrame):
             need_reindex = True or need_reindex
 
         if need_reindex:
-            myReindex = self.reindex(index=newIndex,
-                                     columns=newColumns)
-            hisReindex = other.reindex(index=newIndex,
-                                       columns=newColumns)
+            myReindex = _reindex_changed(self, newIndex, newColumns)
+            hisReindex = _reindex_changed(other, newIndex, newColumns)
         else:
             myReindex = self
             hisReindex = other
@@ -420,8 +428,11 @@ class DataMatrix(DataFrame):
             newCols = self.columns.union(other.index)
 
             # Operate column-wise
-            this = self.reindex(columns=newCols)
-            other = other.reindex(newCols).values
+            this = _reindex_changed(self, None, newCols)
+            if other.index.equals(newCols):
+                other = other.values
+            else:
+                other = other.reindex(newCols).values
 
             resultMatrix = func(this.values, other)
 
@@ -514,6 +525,8 @@ class DataMatrix(DataFrame):
         return (state, objects)
 
     def _matrix_state(self, pickle_index=True):
+        # values is handed to pickle as the ndarray itself; only the small
+        # label arrays go through write_array
         columns = _pickle_array(self.columns)
 
         if pickle_index:
@@ -549,9 +562,13 @@ class DataMatrix(DataFrame):
             return True
 
     def __neg__(self):
-        mycopy = self.copy()
-        mycopy.values = -mycopy.values
-        return mycopy
+        if self.objects:
+            objects = self.objects.copy()
+        else:
+            objects = None
+
+        return DataMatrix(-self.values, index=self.index,
+                          columns=self.columns, objects=objects)
 
     def __repr__(self):
         """Return a string representation for a particular DataMatrix"""
@@ -640,12 +657,14 @@ class DataMatrix(DataFrame):
             self._insert_float_dtype(key, value)
 
     def _insert_float_dtype(self, key, value):
-        isObject = value.dtype not in self._dataTypes
-
+        # New columns are spliced in with np.c_, one allocation and copy of the
+        # block per insert. values stays an exact, contiguous (N, K) array
+        # since it is reassigned and handed to numpy throughout, so there is
+        # no spare column capacity to grow into.
         if key in self.columns:
             loc = self.columns.indexMap[key]
             self.values[:, loc] = value
-        elif isObject:
+        elif value.dtype not in self._dataTypes:
             if self.objects is None:
                 self.objects = DataMatrix({key : value},
                                           index=self.index)
@@ -655,6 +674,7 @@ class DataMatrix(DataFrame):
             self.values = value.reshape((len(value), 1)).astype(np.float)
             self.columns = Index([key])
         else:
+            # the columns are an ndarray, so this is a single C search
             try:
                 loc = self.columns.searchsorted(key)
             except TypeError:
@@ -729,6 +749,7 @@ class DataMatrix(DataFrame):
 
     def __contains__(self, key):
         """True if DataMatrix has this column"""
+        # both checks are lookups in the cached Index.indexMap dicts
         hasCol = key in self.columns
         if hasCol:
             return True
@@ -738,7 +759,13 @@ class DataMatrix(DataFrame):
             return False
 
     def iteritems(self):
-        return self._series.iteritems()
+        # build each Series as it is asked for rather than the whole dict
+        for i, col in enumerate(self.columns):
+            yield col, self._getSeries(loc=i)
+
+        if self.objects is not None:
+            for col, series in self.objects.iteritems():
+                yield col, series
 
 #-------------------------------------------------------------------------------
 # Helper methods
@@ -798,14 +825,16 @@ class DataMatrix(DataFrame):
                 buffer.write(_pf(h, colSpace))
             buffer.write('\n')
 
+            colFormatters = [formatters.get(col, ident) for col in columns]
+
             for i, idx in enumerate(self.index):
-                buffer.write(_pf(idx, idxSpace))
-                for j, col in enumerate(columns):
-                    formatter = formatters.get(col, ident)
-                    buffer.write(_pf(formatter(values[i, j]), colSpace,
-                                     float_format=float_format,
-                                     nanRep=nanRep))
-                buffer.write('\n')
+                row = [_pf(idx, idxSpace)]
+                for formatter, val in zip(colFormatters, values[i]):
+                    row.append(_pf(formatter(val), colSpace,
+                                   float_format=float_format,
+                                   nanRep=nanRep))
+                row.append('\n')
+                buffer.write(''.join(row))
 
     def info(self, buffer=sys.stdout):
         """
@@ -1017,15 +1046,21 @@ class DataMatrix(DataFrame):
         -------
         y : DataMatrix
         """
-        y = np.array(self.values, subok=True)
-        if not issubclass(y.dtype.type, np.int_):
-            mask = np.isnan(self.values)
-            y[mask] = 0
-            result = y.cumsum(axis)
-            has_obs = (-mask).astype(int).cumsum(axis) > 0
+        values = self.values
+        if not issubclass(values.dtype.type, np.int_):
+            # zero the NaNs while copying, and track where each column has
+            # seen an observation without an integer cumsum
+            mask = np.isnan(values)
+            y = np.where(mask, values.dtype.type(0), values)
+            if issubclass(y.dtype.type, np.floating):
+                # y is scratch, so sum it in place
+                result = y.cumsum(axis, out=y)
+            else:
+                result = y.cumsum(axis)
+            has_obs = np.logical_or.accumulate(-mask, axis)
             result[-has_obs] = np.NaN
         else:
-            result = y.cumsum(axis)
+            result = values.cumsum(axis)
 
         return DataMatrix(result, index=self.index,
                           columns=self.columns, objects=self.objects)
@@ -1053,9 +1088,26 @@ class DataMatrix(DataFrame):
         DataMatrix.reindex, DataMatrix.asfreq
         """
         if value is None:
+            fillMethod = method.upper() if method is not None else None
+
+            if (fillMethod in ('PAD', 'BACKFILL') and self.objects is None
+                and self.values.dtype == np.float_):
+                # Fill every column of the block at once; same semantics as
+                # Series.fill, holes are non-finite values
+                values = self.values
+                if fillMethod == 'BACKFILL':
+                    values = values[::-1]
+
+                filled = _pad_values(values)
+
+                if fillMethod == 'BACKFILL':
+                    filled = filled[::-1]
+
+                return DataMatrix(filled, index=self.index,
+                                  columns=self.columns)
+
             result = {}
-            series = self._series
-            for col, s in series.iteritems():
+            for col, s in self.iteritems():
                 result[col] = s.fill(method=method, value=value)
 
             return DataMatrix(result, index=self.index, objects=self.objects)
@@ -1065,7 +1117,8 @@ class DataMatrix(DataFrame):
                 return self
 
             vals = self.values.copy()
-            vals.flat[common.isnull(vals.ravel())] = value
+            mask = common.isnull(vals.ravel()).reshape(vals.shape)
+            np.putmask(vals, mask, value)
 
             objects = None
 
@@ -1233,3 +1286,31 @@ class DataMatrix(DataFrame):
 def _reorder_columns(mat, current, desired):
     indexer, mask = common.get_indexer(current, desired, None)
     return mat.take(indexer[mask], axis=1)
+
+def _reindex_changed(frame, index, columns):
+    """
+    Reindex only the axes of frame that differ from the given ones, rather
+    than copying the values for an axis that already lines up
+    """
+    if frame.index.equals(index):
+        index = None
+    if frame.columns.equals(columns):
+        columns = None
+    return frame.reindex(index=index, columns=columns)
+
+def _pad_values(values):
+    """
+    Carry the last finite value in each column forward over the holes below
+    it. Holes before the first finite value are left as NaN
+    """
+    N, K = values.shape
+    mask = np.isfinite(values)
+
+    # position of the last finite value at or above each cell
+    indexer = np.where(mask, np.arange(N).reshape((N, 1)), 0)
+    np.maximum.accumulate(indexer, axis=0, out=indexer)
+
+    result = values[indexer, np.arange(K)]
+    np.putmask(result, -np.logical_or.accumulate(mask, axis=0), np.NaN)
+
+    return result
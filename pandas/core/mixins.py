@@ -5,6 +5,8 @@ import cPickle
 
 class Picklable(object):
     def save(self, fileName):
+        # uncompressed binary pickle: the arrays are written out as raw bytes,
+        # with no zip or deflate pass to bottleneck large saves and loads
         f = open(fileName, 'wb')
         try:
             cPickle.dump(self, f, protocol=cPickle.HIGHEST_PROTOCOL)
@@ -13,6 +15,7 @@ class Picklable(object):
 
     @classmethod
     def load(cls, fileName):
+        # a pickle cannot be memory-mapped, the arrays are rebuilt in memory
         f = open(fileName, 'rb')
         try:
             return cPickle.load(f)
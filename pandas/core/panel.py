@@ -14,7 +14,7 @@ import numpy as np
 from pandas.core.groupby import GroupBy
 from pandas.core.index import Index
 from pandas.core.frame import DataFrame
-from pandas.core.matrix import DataMatrix
+from pandas.core.matrix import DataMatrix, _reindex_changed
 from pandas.core.mixins import Picklable
 import pandas.core.common as common
 import pandas.lib.tseries as tseries
@@ -76,6 +76,12 @@ def _wide_arith_method(op, name):
 
     return f
 
+def _values_from_state(vals):
+    # older pickles hold the values as a write_array string
+    if isinstance(vals, str):
+        return common._unpickle_array(vals)
+    return vals
+
 class PanelAxis(object):
 
     def __init__(self, cache_field):
@@ -340,7 +346,9 @@ class WidePanel(Panel):
         "Returned pickled representation of the panel"
         _pickle = common._pickle_array
 
-        return (_pickle(self.values), _pickle(self.items),
+        # the values go to pickle as an ndarray rather than through a
+        # write_array string buffer, which copied them twice more
+        return (self.values, _pickle(self.items),
                 _pickle(self.major_axis), _pickle(self.minor_axis))
 
     def __setstate__(self, state):
@@ -351,7 +359,7 @@ class WidePanel(Panel):
         self.items = _unpickle(items)
         self.major_axis = _unpickle(major)
         self.minor_axis = _unpickle(minor)
-        self.values = _unpickle(vals)
+        self.values = _values_from_state(vals)
 
     def conform(self, frame, axis='items'):
         """
@@ -488,7 +496,8 @@ class WidePanel(Panel):
         else:
             # Float type values
             vals = self.values.copy()
-            vals.flat[common.isnull(vals.ravel())] = value
+            mask = common.isnull(vals.ravel()).reshape(vals.shape)
+            np.putmask(vals, mask, value)
 
             return WidePanel(vals, self.items, self.major_axis,
                              self.minor_axis)
@@ -650,7 +659,7 @@ class WidePanel(Panel):
         y : WidePanel
         """
         intersection = self.items.intersection(items)
-        indexer = [self.items.indexMap[col] for col in intersection]
+        indexer, _ = common.get_indexer(self.items, intersection, None)
 
         new_values = self.values.take(indexer, axis=0)
         return WidePanel(new_values, intersection, self.major_axis,
@@ -685,8 +694,7 @@ class WidePanel(Panel):
         mask = np.isfinite(values)
 
         if fill_value is not None:
-            values = values.copy()
-            values[-mask] = fill_value
+            values = np.where(mask, values, fill_value)
 
         result = func(values, axis=axis)
         count = mask.sum(axis=axis)
@@ -702,8 +710,7 @@ class WidePanel(Panel):
         mask = np.isfinite(values)
 
         if fill_value is not None:
-            values = values.copy()
-            values[-mask] = fill_value
+            values = np.where(mask, values, fill_value)
 
         result = func(values, axis=axis)
 
@@ -861,12 +868,12 @@ class WidePanel(Panel):
         """
         i = self._get_axis_number(axis)
 
-        y = np.array(self.values)
-        mask = np.isfinite(y)
+        values = self.values
+        mask = np.isfinite(values)
 
-        fill_value = y.flat[mask.ravel()].min() - 1
+        fill_value = values[mask].min() - 1
 
-        y[-mask] = fill_value
+        y = np.where(mask, values, fill_value)
 
         result = y.max(axis=i)
         result[result == fill_value] = np.NaN
@@ -882,12 +889,12 @@ class WidePanel(Panel):
         """
         i = self._get_axis_number(axis)
 
-        y = np.array(self.values)
-        mask = np.isfinite(y)
+        values = self.values
+        mask = np.isfinite(values)
 
-        fill_value = y.flat[mask.ravel()].max() + 1
+        fill_value = values[mask].max() + 1
 
-        y[-mask] = fill_value
+        y = np.where(mask, values, fill_value)
 
         result = y.min(axis=i)
         result[result == fill_value] = np.NaN
@@ -1147,7 +1154,7 @@ class LongPanel(Panel):
     def __getstate__(self):
         "Returned pickled representation of the panel"
 
-        return (common._pickle_array(self.values),
+        return (self.values,
                 common._pickle_array(self.items),
                 self.index)
 
@@ -1157,7 +1164,7 @@ class LongPanel(Panel):
 
         self.items = common._unpickle_array(items)
         self.index = index
-        self.values = common._unpickle_array(vals)
+        self.values = _values_from_state(vals)
 
     def _combine(self, other, func, axis='items'):
         if isinstance(other, DataFrame):
@@ -1378,7 +1385,7 @@ class LongPanel(Panel):
         WidePanel
         """
         intersection = self.items.intersection(items)
-        indexer = [self.items.indexMap[col] for col in intersection]
+        indexer, _ = common.get_indexer(self.items, intersection, None)
 
         new_values = self.values.take(indexer, axis=1)
         return LongPanel(new_values, intersection, self.index)
@@ -1886,17 +1893,22 @@ def _homogenize(frames, intersect=True):
             else:
                 columns |= set(frame.cols())
 
-    columns = sorted(columns)
+    columns = Index(sorted(columns))
 
+    # frames that already line up are used as they are, since fromDict
+    # copies them into the panel values anyway
     if intersect:
         for key, frame in adj_frames.iteritems():
-            result[key] = frame.filter(columns).reindex(index)
+            frame = frame.filter(columns)
+            if not frame.index.equals(index):
+                frame = frame.reindex(index)
+            result[key] = frame
     else:
         for key, frame in adj_frames.iteritems():
             if not isinstance(frame, DataMatrix):
                 frame = frame.toDataMatrix()
 
-            result[key] = frame.reindex(index=index, columns=columns)
+            result[key] = _reindex_changed(frame, index, columns)
 
     return result, index, columns
 
@@ -1150,20 +1150,14 @@ def _seriesRepr(index, vals, nanRep='NaN'):
     maxlen = max(len(x) for x in string_index)
     padSpace = min(maxlen, 60)
 
-    if vals.dtype == np.object_:
-        def _format(k, v):
-            return '%s    %s' % (str(k).ljust(padSpace), v)
-    elif vals.dtype == np.float_:
-        def _format(k, v):
-            if np.isnan(v):
-                v = nanRep
-            else:
-                v = str(v)
-
-            return '%s    %s' % (str(k).ljust(padSpace), v)
-    else:
-        def _format(k, v):
-            return '%s    %s' % (str(k).ljust(padSpace), v)
+    if vals.dtype == np.float_:
+        # find the NaNs with one isnan over the array, not one per value
+        nanMask = np.isnan(vals)
+        vals = [nanRep if isnan else str(v)
+                for v, isnan in itertools.izip(vals, nanMask)]
+
+    def _format(k, v):
+        return '%s    %s' % (str(k).ljust(padSpace), v)
 
     it = itertools.starmap(_format,
                            itertools.izip(string_index, vals))
@@ -757,6 +757,29 @@ def test_Second():
     assert (Second(3) + Second(2)) == Second(5)
     assert (Second(3) - Second(2)) == Second()
 
+def test_Tick_pickle():
+    import cPickle
+
+    base = datetime(2010, 1, 1)
+    for offset in (Hour(2), Minute(5), Second(-3)):
+        for protocol in (0, cPickle.HIGHEST_PROTOCOL):
+            unpickled = cPickle.loads(cPickle.dumps(offset, protocol))
+
+            assert unpickled == offset
+            assert hash(unpickled) == hash(offset)
+            assertEq(unpickled, base, base + offset.delta)
+
+    # pickled before the delta was set in __init__, so no _delta in state
+    state = Minute(5).__getstate__()
+    assert '_delta' not in state
+
+    unpickled = Minute.__new__(Minute)
+    unpickled.__setstate__(state)
+
+    assert unpickled == Minute(5)
+    assert hash(unpickled) == hash(Minute(5))
+    assertEq(unpickled, base, datetime(2010, 1, 1, 0, 5))
+
 def test_inferTimeRule():
     index1 = [datetime(2010, 1, 29, 0, 0),
               datetime(2010, 2, 26, 0, 0),
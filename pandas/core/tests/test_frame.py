@@ -208,8 +208,14 @@ class TestDataFrame(unittest.TestCase):
         assert_frame_equal(result, self.frame.apply(np.sqrt))
 
     def test_pickle(self):
-        unpickled = pickle.loads(pickle.dumps(self.mixed_frame))
-        assert_frame_equal(self.mixed_frame, unpickled)
+        for protocol in (0, pickle.HIGHEST_PROTOCOL):
+            unpickled = pickle.loads(pickle.dumps(self.mixed_frame, protocol))
+
+            # assert_almost_equal only handles numbers, so check the string
+            # column on its own
+            self.assert_((unpickled['foo'] == 'bar').all())
+            del unpickled['foo']
+            assert_frame_equal(self.frame, unpickled)
 
     def test_toDict(self):
         test_data = {
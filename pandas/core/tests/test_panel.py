@@ -15,18 +15,44 @@ from pandas.util.testing import (assert_panel_equal,
 import pandas.core.panel as panelm
 import pandas.util.testing as common
 
-class PanelTests(object):
+class PanelPickleTests(object):
 
-    def test_iter(self):
-        common.equalContents(list(self.panel), self.panel.items)
+    def _check_unpickled(self, unpickled):
+        self.assert_(type(unpickled) is type(self.panel))
+        for axis in ('items', 'major_axis', 'minor_axis'):
+            self.assert_(np.array_equal(getattr(unpickled, axis),
+                                        getattr(self.panel, axis)))
+        self.assertEqual(unpickled.values.shape, self.panel.values.shape)
+        assert_almost_equal(unpickled.values.ravel(),
+                            self.panel.values.ravel())
 
     def test_pickle(self):
         import cPickle
 
-        pickled = cPickle.dumps(self.panel)
-        unpickled = cPickle.loads(pickled)
+        for protocol in (0, cPickle.HIGHEST_PROTOCOL):
+            pickled = cPickle.dumps(self.panel, protocol)
+            unpickled = cPickle.loads(pickled)
+
+            self._check_unpickled(unpickled)
+
+    def test_pickle_string_values(self):
+        # older pickles hold the values as a write_array string
+        from pandas.core.common import _pickle_array
 
-        assert_frame_equal(unpickled['ItemA'], self.panel['ItemA'])
+        state = list(self.panel.__getstate__())
+        self.assert_(isinstance(state[0], np.ndarray))
+        state[0] = _pickle_array(self.panel.values)
+
+        klass = type(self.panel)
+        unpickled = klass.__new__(klass)
+        unpickled.__setstate__(tuple(state))
+
+        self._check_unpickled(unpickled)
+
+class PanelTests(PanelPickleTests):
+
+    def test_iter(self):
+        common.equalContents(list(self.panel), self.panel.items)
 
     def test_repr(self):
         foo = repr(self.panel)
@@ -579,7 +605,7 @@ class TestLongPanelIndex(unittest.TestCase):
     def test_dims(self):
         pass
 
-class TestLongPanel(unittest.TestCase):
+class TestLongPanel(unittest.TestCase, PanelPickleTests):
 
     def setUp(self):
         panel = common.makeWidePanel()
@@ -588,15 +614,6 @@ class TestLongPanel(unittest.TestCase):
         self.panel = panel.toLong()
         self.unfiltered_panel = panel.toLong(filter_observations=False)
 
-    def test_pickle(self):
-        import cPickle
-
-        pickled = cPickle.dumps(self.panel)
-        unpickled = cPickle.loads(pickled)
-
-        assert_almost_equal(unpickled['ItemA'].values,
-                            self.panel['ItemA'].values)
-
     def test_len(self):
         len(self.unfiltered_panel)
 
@@ -34,6 +34,30 @@ def inv(a):
     except linalg.LinAlgError:
         return np.linalg.pinv(a)
 
+def inv_sandwich(a, b):
+    """
+    Returns A^-1 B A^-1 for symmetric A, by two solves against A rather
+    than forming its inverse.
+    """
+    return solve(a, solve(a, b).T).T
+
+def xtx(x):
+    """
+    Returns X'X. Only one triangle is computed, using the BLAS symmetric
+    rank-k update if SciPy exposes it, and then mirrored.
+    """
+    x = np.asarray(x)
+
+    try:
+        from scipy.linalg.blas import get_blas_funcs
+        syrk = get_blas_funcs('syrk', (x,))
+    except (ImportError, ValueError, AttributeError):
+        return np.dot(x.T, x)
+
+    # x.T is Fortran-ordered, so it is passed to BLAS without a copy
+    xx = syrk(1.0, x.T)
+    return np.triu(xx) + np.triu(xx, 1).T
+
 def is_psd(m):
     eigvals = linalg.eigvals(m)
     return np.isreal(eigvals).all() and (eigvals >= 0).all()
@@ -63,19 +87,25 @@ def newey_west(m, max_lags, nobs, df, nw_overlap=False):
     Semi-definite, Heteroskedasticity and Autocorrelation Consistent
     Covariance Matrix, Econometrica, vol. 55(3), 703-708
     """
-    Xeps = np.dot(m.T, m)
-    for lag in xrange(1, max_lags + 1):
-        auto_cov = np.dot(m[:-lag].T, m[lag:])
-        weight = lag / (max_lags + 1)
+    Xeps = xtx(m)
+
+    if max_lags > 0:
+        # Bartlett kernel weights, no downweighting with overlap
         if nw_overlap:
-            weight = 0
-        bb = auto_cov + auto_cov.T
-        dd = (1 - weight) * bb
-        Xeps += dd
+            weights = np.ones(max_lags)
+        else:
+            weights = 1 - np.arange(1, max_lags + 1) / (max_lags + 1)
+
+        # accumulate the weighted autocovariances, symmetrize once
+        auto_cov = np.zeros(Xeps.shape)
+        for lag in xrange(1, max_lags + 1):
+            auto_cov += weights[lag - 1] * np.dot(m[:-lag].T, m[lag:])
+
+        Xeps += auto_cov + auto_cov.T
 
     Xeps *= nobs / (nobs - df)
 
-    if nw_overlap and not is_psd(Xeps):
+    if nw_overlap and max_lags > 0 and not is_psd(Xeps):
         new_max_lags = int(np.ceil(max_lags * 1.5))
 #         print ('nw_overlap is True and newey_west generated a non positive '
 #                'semidefinite matrix, so using newey_west with max_lags of %d.'
@@ -110,17 +140,24 @@ def calc_F(R, r, beta, var_beta, nobs, df):
     """
     from scipy.stats import f
 
-    hyp = np.dot(R, beta.reshape(len(beta), 1)) - r
-    RSR = np.dot(R, np.dot(var_beta, R.T))
-
     q = len(r)
 
-    F = np.dot(hyp.T, np.dot(inv(RSR), hyp)).squeeze() / q
+    F = calc_F_stat(R, r, beta, var_beta)
 
     p_value = 1 - f.cdf(F, q, nobs - df)
 
     return F, (q, nobs - df), p_value
 
+def calc_F_stat(R, r, beta, var_beta):
+    """
+    Computes the F-test statistic alone, as in calc_F, for callers that
+    take the p values of many statistics at once
+    """
+    hyp = np.dot(R, beta.reshape(len(beta), 1)) - r
+    RSR = np.dot(R, np.dot(var_beta, R.T))
+
+    return np.dot(hyp.T, np.dot(inv(RSR), hyp)).squeeze() / len(r)
+
 def chain_dot(*matrices):
     """
     Returns the dot product of the given matrices.
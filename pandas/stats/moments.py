@@ -7,7 +7,8 @@ from functools import wraps
 from numpy import NaN
 import numpy as np
 
-from pandas.core.api import (DataFrame, DataMatrix, Series, notnull)
+from pandas.core.api import (DataFrame, DataMatrix, Series, TimeSeries,
+                             isnull, notnull)
 import pandas.lib.tseries as tseries
 import pandas.util.misc as misc_util
 
@@ -21,11 +22,31 @@ __all__ = ['rolling_count', 'rolling_max', 'rolling_min',
 # Python interface to Cython functions
 
 def _check_arg(arg):
+    # The Cython routines only take float64 buffers: float64 input passes
+    # through without a copy, anything else (float32 included) is cast.
+    # DataMatrix values are cast a block of columns at a time, see
+    # _column_apply, so at most a block-sized copy is live
     if not issubclass(arg.dtype.type, float):
         arg = arg.astype(float)
 
     return arg
 
+def _sanitize_arg(arg):
+    """
+    Float ndarray of arg with infinities replaced by NaN. The input is
+    left untouched and only copied when there is something to replace.
+    """
+    values = np.asarray(arg)
+    result = _check_arg(values)
+
+    infs = np.isinf(result)
+    if infs.any():
+        if result is values:
+            result = result.copy()
+        result[infs] = NaN
+
+    return result
+
 def _two_periods(minp, window):
     if minp is None:
         return window
@@ -38,10 +59,30 @@ def _use_window(minp, window):
     else:
         return minp
 
-def _wrap_cython(f, check_minp=_use_window):
+def _center(arg):
+    # Moments above the first do not change when the data is shifted. With
+    # the mean taken out, the running sums of powers the kernels add to and
+    # subtract from stay small, so differencing them loses fewer digits
+    valid = arg[arg == arg]
+    if len(valid) == 0:
+        return arg
+
+    return arg - valid.mean()
+
+def _wrap_cython(f, check_minp=_use_window, center=False):
     def wrapper(arg, window, minp=None):
         minp = check_minp(minp, window)
         arg = _check_arg(arg)
+
+        if center:
+            arg = _center(arg)
+
+        # A window longer than the data gives the same result as one
+        # spanning all of it, and keeps the skip list kernels' state (sized
+        # by the window) no bigger than what they will actually hold
+        if window > len(arg) > 0:
+            window = len(arg)
+
         return f(arg, window, minp)
 
     return wrapper
@@ -51,10 +92,24 @@ _rolling_max = _wrap_cython(tseries.roll_max)
 _rolling_min = _wrap_cython(tseries.roll_min)
 _rolling_mean = _wrap_cython(tseries.roll_mean)
 _rolling_median = _wrap_cython(tseries.roll_median)
-_rolling_var = _wrap_cython(tseries.roll_var, check_minp=_two_periods)
-_rolling_skew = _wrap_cython(tseries.roll_skew, check_minp=_two_periods)
-_rolling_kurt = _wrap_cython(tseries.roll_kurt, check_minp=_two_periods)
-_rolling_std = lambda *a, **kw: np.sqrt(_rolling_var(*a, **kw))
+_rolling_var = _wrap_cython(tseries.roll_var, check_minp=_two_periods,
+                            center=True)
+_rolling_skew = _wrap_cython(tseries.roll_skew, check_minp=_two_periods,
+                             center=True)
+_rolling_kurt = _wrap_cython(tseries.roll_kurt, check_minp=_two_periods,
+                             center=True)
+
+def _rolling_std(*args, **kwargs):
+    result = _rolling_var(*args, **kwargs)
+    return np.sqrt(result, result)
+
+def _conform_time_rule(arg, time_rule):
+    types = (DataFrame, DataMatrix, Series)
+    if time_rule is not None and isinstance(arg, types):
+        # Conform to whatever frequency needed.
+        arg = arg.asfreq(time_rule)
+
+    return arg
 
 def _ewma(arg, com):
     arg = _check_arg(arg)
@@ -99,26 +154,30 @@ def rolling_count(arg, window, time_rule=None):
     arg :  DataFrame or numpy ndarray-like
     window : Number of observations used for calculating statistic
     """
-    types = (DataFrame, DataMatrix, Series)
-    if time_rule is not None and isinstance(arg, types):
-        # Conform to whatever frequency needed.
-        arg = arg.asfreq(time_rule)
+    arg = _conform_time_rule(arg, time_rule)
 
     window = min(window, len(arg))
+
+    def _count(values):
+        # Integer running total of the one-byte finiteness mask, down the
+        # first axis; differencing it over the window is exact
+        counts = np.isfinite(np.asarray(values)).cumsum(0)
+        result = counts.astype(float)
+        result[window:] -= counts[:len(counts) - window]
+        return result
+
     if isinstance(arg, DataMatrix):
-        arg = arg.copy()
-        arg.values = np.isfinite(arg.values).astype(float)
-        result = rolling_sum(arg, window, min_periods=1, time_rule=time_rule)
-        result.values[np.isnan(result.values)] = 0
+        result = DataMatrix(_count(arg.values), index=arg.index,
+                            columns=arg.columns)
     elif isinstance(arg, DataFrame):
-        converter = lambda x: np.isfinite(x).astype(float)
-        arg = arg.apply(converter)
-        result = rolling_sum(arg, window, min_periods=1, time_rule=time_rule)
-        result = result.fill(value=0)
+        result = DataFrame(index=arg.index)
+        for col, series in arg.iteritems():
+            result[col] = Series(_count(series), index=arg.index)
+    elif isinstance(arg, Series):
+        result = Series(_count(arg), index=arg.index)
     else:
-        arg = np.isfinite(arg).astype(float)
-        result = rolling_sum(arg, window, min_periods=1, time_rule=time_rule)
-        result[np.isnan(result)] = 0
+        result = _count(arg)
+
     return result
 
 def rolling_cov(arg1, arg2, window, min_periods=None, time_rule=None):
@@ -134,9 +193,13 @@ def rolling_cov(arg1, arg2, window, min_periods=None, time_rule=None):
     time_rule : {None, 'WEEKDAY', 'EOM', 'W@MON', ...}, default=None
         Name of time rule to conform to before computing statistic
     """
-    num1 = rolling_mean(arg1*arg2, window, min_periods, time_rule) #E(XY)
-    num2 = (rolling_mean(arg1, window, min_periods, time_rule) *
-            rolling_mean(arg2, window, min_periods, time_rule)) #E(X)E(Y)
+    # Conform once here rather than in each of the rolling means below
+    arg1 = _conform_time_rule(arg1, time_rule)
+    arg2 = _conform_time_rule(arg2, time_rule)
+
+    num1 = rolling_mean(arg1*arg2, window, min_periods) #E(XY)
+    num2 = (rolling_mean(arg1, window, min_periods) *
+            rolling_mean(arg2, window, min_periods)) #E(X)E(Y)
     return (num1 - num2) * window / (window - 1)
 
 def rolling_corr(arg1, arg2, window, min_periods=None, time_rule=None):
@@ -152,9 +215,12 @@ def rolling_corr(arg1, arg2, window, min_periods=None, time_rule=None):
     time_rule : {None, 'WEEKDAY', 'EOM', 'W@MON', ...}, default=None
         Name of time rule to conform to before computing statistic
     """
-    num = rolling_cov(arg1, arg2, window, min_periods, time_rule)
-    den  = (rolling_std(arg1, window, min_periods, time_rule) *
-            rolling_std(arg2, window, min_periods, time_rule))
+    arg1 = _conform_time_rule(arg1, time_rule)
+    arg2 = _conform_time_rule(arg2, time_rule)
+
+    num = rolling_cov(arg1, arg2, window, min_periods)
+    den  = (rolling_std(arg1, window, min_periods) *
+            rolling_std(arg2, window, min_periods))
     return num / den
 
 rolling_max = _rolling_func(_rolling_max, 'Moving maximum')
@@ -168,6 +234,34 @@ rolling_var = _rolling_func(_rolling_var, 'Unbiased moving variance')
 rolling_skew = _rolling_func(_rolling_skew, 'Unbiased moving skewness')
 rolling_kurt = _rolling_func(_rolling_kurt, 'Unbiased moving kurtosis')
 
+# Number of values (256KB of float64) laid out contiguously at a time
+_BLOCK_ELEMENTS = 2 ** 15
+
+def _column_apply(values, func):
+    """
+    Apply a function of a 1D float array down each column of a 2D array,
+    returning the results as a column-major float array.
+
+    Columns are copied to column-major layout a block at a time, so every
+    column handed to func is contiguous and still in cache, without
+    transposing the whole matrix up front. Infinities are replaced by NaN.
+
+    Columns are processed serially: the compiled Cython routines hold the
+    GIL for their whole loop, so handing columns to threads would not run
+    them concurrently.
+    """
+    T, N = values.shape
+    result = np.empty((T, N), dtype=float, order='F')
+
+    blockSize = max(1, _BLOCK_ELEMENTS // max(T, 1))
+    for start in range(0, N, blockSize):
+        end = min(start + blockSize, N)
+        block = _sanitize_arg(np.asfortranarray(values[:, start:end]))
+        for i in range(start, end):
+            result[:, i] = func(block[:, i - start])
+
+    return result
+
 def _rollingMoment(arg, window, func, minp, time_rule=None):
     """
     Rolling statistical measure using supplied function. Designed to be
@@ -181,37 +275,57 @@ def _rollingMoment(arg, window, func, minp, time_rule=None):
     minp : int
         Minimum number of observations required to have a value
     """
-    types = (DataFrame, DataMatrix, Series)
-    if time_rule is not None and isinstance(arg, types):
-        # Conform to whatever frequency needed.
-        arg = arg.asfreq(time_rule)
+    arg = _conform_time_rule(arg, time_rule)
 
-    if isinstance(arg, DataMatrix):
-        T, N = arg.values.shape
-        resultMatrix = np.empty((T, N), dtype=arg.values.dtype)
-        arg.values[np.isinf(arg.values)] = NaN
-        for i in range(N):
-            resultMatrix[:, i] = func(arg.values[:, i], window, minp=minp)
-        output = DataMatrix(resultMatrix, index=arg.index,
-                            columns=arg.columns)
+    handler = _roll_handlers.get(type(arg))
+    if handler is None:
+        handler = _roll_handler_for(arg)
+
+    return handler(arg, window, func, minp)
+
+def _roll_matrix(arg, window, func, minp):
+    resultMatrix = _column_apply(arg.values,
+                                 lambda x: func(x, window, minp=minp))
+    return DataMatrix(resultMatrix, index=arg.index, columns=arg.columns)
+
+def _roll_frame(arg, window, func, minp):
+    output = DataFrame(index = arg.index)
+    for col, series in arg.iteritems():
+        output[col] = Series(func(_sanitize_arg(series), window, minp=minp),
+                             index=series.index)
+    return output
 
+def _roll_series(arg, window, func, minp):
+    return Series(func(_sanitize_arg(arg), window, minp=minp),
+                  index=arg.index)
+
+def _roll_array(arg, window, func, minp):
+    try:
+        assert(hasattr(arg, '__iter__'))
+    except AssertionError:
+        raise AssertionError('Expected DataFrame or array-like argument')
+    return func(_sanitize_arg(arg), window, minp=minp)
+
+# Looked up on the exact type of the argument, which covers nearly every
+# call without walking an isinstance chain
+_roll_handlers = {
+    DataMatrix : _roll_matrix,
+    DataFrame : _roll_frame,
+    Series : _roll_series,
+    TimeSeries : _roll_series,
+    np.ndarray : _roll_array
+}
+
+def _roll_handler_for(arg):
+    # Subclasses and other iterables
+    if isinstance(arg, DataMatrix):
+        return _roll_matrix
     elif isinstance(arg, DataFrame):
-        output = DataFrame(index = arg.index)
-        for col, series in arg.iteritems():
-            series[np.isinf(series)] = NaN
-            output[col] = Series(func(series, window, minp=minp),
-                                 index=series.index)
+        return _roll_frame
     elif isinstance(arg, Series):
-        arg[np.isinf(arg)] = NaN
-        output = Series(func(arg, window, minp=minp), index=arg.index)
+        return _roll_series
     else:
-        try:
-            assert(hasattr(arg, '__iter__'))
-        except AssertionError:
-            raise AssertionError('Expected DataFrame or array-like argument')
-        arg[np.isinf(arg)] = NaN
-        output = func(arg, window, minp=minp)
-    return output
+        return _roll_array
 
 #-------------------------------------------------------------------------------
 # Exponential moving moments
@@ -312,30 +426,51 @@ def ewma(arg, com=None, span=None, minCom=0):
     elif com is not None and span is not None:
         raise Exception("com and span are mutually exclusive")
 
-    def ewmaFunc(series):
-        series[np.isinf(series)] = NaN
-        result = _ewma(series, com)
+    if span is not None:
+        com = (span - 1) / 2.
+
+    # Leading values masked by minCom, derived once for all columns
+    minPeriods = int(minCom * com)
 
-        firstIndex = _first_valid_index(series)
+    def ewmaArr(values):
+        result = _ewma(values, com)
 
-        result[firstIndex : firstIndex + minCom*com] = NaN
-        result = Series(result, index=arg.index)
+        firstIndex = _first_valid_index(values)
+
+        result[firstIndex : firstIndex + minPeriods] = NaN
         return result
 
+    def ewmaFunc(series):
+        return Series(ewmaArr(_sanitize_arg(series)), index=arg.index)
+
     if isinstance(arg, Series):
         output = ewmaFunc(arg)
+    elif isinstance(arg, DataMatrix):
+        # straight down the value matrix, no Series per column
+        output = DataMatrix(_column_apply(arg.values, ewmaArr),
+                            index=arg.index, columns=arg.columns)
     elif isinstance(arg, DataFrame):
         output = arg.apply(ewmaFunc)
     else:
-        output = _ewma(arg, com)
-        firstIndex = _first_valid_index(arg)
-        output[firstIndex : firstIndex + minCom * com] = NaN
+        output = ewmaArr(arg)
 
     return output
 
 def _first_valid_index(arr):
-    # argmax scans from left
-    return notnull(arr).argmax()
+    # The first valid value is nearly always at or near the start, so scan
+    # in doubling chunks from the left instead of masking the whole array.
+    # Like argmax on an all-False mask, returns 0 if nothing is valid
+    arr = np.asarray(arr)
+    start, size = 0, 16
+    while start < len(arr):
+        mask = notnull(arr[start : start + size])
+        if mask.any():
+            # argmax scans from left
+            return start + mask.argmax()
+        start += size
+        size *= 2
+
+    return 0
 
 def ewmvar(arg, com, minCom = 0, correctBias = True):
     """
@@ -386,10 +521,14 @@ def ewmvol(arg, com, minCom=0, correctBias = True):
     """
     result = ewmvar(arg, com=com, minCom=minCom, correctBias=correctBias)
 
-    if isinstance(result, DataFrame):
-        result = result.apply(np.sqrt)
+    # result is freshly allocated, take the square root in place
+    if isinstance(result, DataMatrix):
+        np.sqrt(result.values, result.values)
+    elif isinstance(result, DataFrame):
+        for col, series in result.iteritems():
+            np.sqrt(series, series)
     else:
-        result = np.sqrt(result)
+        np.sqrt(result, result)
 
     return result
 
@@ -418,19 +557,7 @@ def ewmcov(seriesA, seriesB, com, minCom=0, correctBias=True):
     else:
         biasCorrection = 1.0
 
-    if not isinstance(seriesB, type(seriesA)):
-        raise Exception('Input arrays must be of the same type!')
-
-    if isinstance(seriesA, Series):
-        if seriesA.index is not seriesB.index:
-            commonIndex = seriesA.index.intersection(seriesB.index)
-            seriesA = seriesA.reindex(commonIndex)
-            seriesB = seriesB.reindex(commonIndex)
-
-    okLocs = notnull(seriesA) & notnull(seriesB)
-
-    cleanSeriesA = seriesA[okLocs]
-    cleanSeriesB = seriesB.reindex(cleanSeriesA.index)
+    cleanSeriesA, cleanSeriesB = _prep_binary(seriesA, seriesB)
 
     XY = ewma(cleanSeriesA * cleanSeriesB, com=com, minCom=minCom)
     X  = ewma(cleanSeriesA, com=com, minCom=minCom)
@@ -456,6 +583,23 @@ def ewmcorr(seriesA, seriesB, com, minCom=0):
         Optionally require that at least a certain number of periods as
         a multiple of the Center of Mass be included in the sample.
     """
+    cleanSeriesA, cleanSeriesB = _prep_binary(seriesA, seriesB)
+
+    XY = ewma(cleanSeriesA * cleanSeriesB, com=com, minCom=minCom)
+    X  = ewma(cleanSeriesA, com=com, minCom=minCom)
+    Y  = ewma(cleanSeriesB, com=com, minCom=minCom)
+
+    # uncorrected variances, reusing the first moments computed above
+    varX = ewma(cleanSeriesA * cleanSeriesA, com=com, minCom=minCom) - X**2
+    varY = ewma(cleanSeriesB * cleanSeriesB, com=com, minCom=minCom) - Y**2
+
+    return (XY - X * Y) / np.sqrt(varX * varY)
+
+def _prep_binary(seriesA, seriesB):
+    """
+    Align two inputs and restrict both to the observations they have in
+    common
+    """
     if not isinstance(seriesB, type(seriesA)):
         raise Exception('Input arrays must be of the same type!')
 
@@ -468,13 +612,13 @@ def ewmcorr(seriesA, seriesB, com, minCom=0):
     okLocs = notnull(seriesA) & notnull(seriesB)
 
     cleanSeriesA = seriesA[okLocs]
-    cleanSeriesB = seriesB.reindex(cleanSeriesA.index)
-
-    XY = ewma(cleanSeriesA * cleanSeriesB, com=com, minCom=minCom)
-    X  = ewma(cleanSeriesA, com=com, minCom=minCom)
-    Y  = ewma(cleanSeriesB, com=com, minCom=minCom)
-    varX = ewmvar(cleanSeriesA, com=com, minCom=minCom, correctBias=False)
-    varY = ewmvar(cleanSeriesB, com=com, minCom=minCom, correctBias=False)
+    if isinstance(seriesA, Series):
+        # Both are on the same index by now: mask B's values directly and
+        # share A's index rather than looking every date up again
+        cleanSeriesB = Series(np.asarray(seriesB)[okLocs],
+                              index=cleanSeriesA.index)
+    else:
+        cleanSeriesB = seriesB.reindex(cleanSeriesA.index)
 
-    return (XY - X * Y) / np.sqrt(varX * varY)
+    return cleanSeriesA, cleanSeriesB
 
@@ -4,20 +4,27 @@ Ordinary least squares regression
 
 # pylint: disable-msg=W0201
 
-from itertools import izip, starmap
+from itertools import izip
 from StringIO import StringIO
 
 import numpy as np
 
-from pandas.core.api import DataFrame, DataMatrix, Series
-from pandas.core.panel import WidePanel
+from pandas.core.api import DataFrame, DataMatrix, Index, Series
+from pandas.core.panel import LongPanel, WidePanel
 from pandas.util.decorators import cache_readonly
 import pandas.stats.common as common
 import pandas.stats.math as math
-import pandas.stats.moments as moments
 
 _FP_ERR = 1e-13
 
+# bound on the number of projected values, rows spanned x dates, computed
+# at once in the forecast vol
+_FORECAST_BLOCK = 2 ** 15
+
+# fewest dates per block for which the masked product beats one product per
+# date; windows too wide for that are projected date by date
+_FORECAST_MIN_BLOCK = 40
+
 class OLS(object):
     """
     Runs a full sample ordinary least squares regression
@@ -50,7 +57,7 @@ class OLS(object):
         self._x_raw = self._x.values
         self._y_raw = self._y.view(np.ndarray)
 
-        self.sm_ols = sm.OLS(self._y_raw, self._x.values).fit()
+        self.sm_ols = sm.OLS(self._y_raw, self._x_raw).fit()
 
     def _prepare_data(self):
         """
@@ -103,7 +110,7 @@ class OLS(object):
     @cache_readonly
     def _df_raw(self):
         """Returns the degrees of freedom."""
-        return math.rank(self._x.values)
+        return math.rank(self._x_raw)
 
     @cache_readonly
     def df(self):
@@ -187,34 +194,7 @@ class OLS(object):
         o.f_test(['1*x1+2*x2=0','1*x3=0'])
         """
 
-        x_names = self._x.columns
-
-        R = []
-        r = []
-
-        if isinstance(hypothesis, str):
-            eqs = hypothesis.split(',')
-        elif isinstance(hypothesis, list):
-            eqs = hypothesis
-        else:
-            raise Exception('hypothesis must be either string or list')
-        for equation in eqs:
-            row = np.zeros(len(x_names))
-            lhs, rhs = equation.split('=')
-            for s in lhs.split('+'):
-                ss = s.split('*')
-                coeff = float(ss[0])
-                x_name = ss[1]
-                idx = x_names.indexMap[x_name]
-                row[idx] = coeff
-            rhs = float(rhs)
-
-            R.append(row)
-            r.append(rhs)
-
-        R = np.array(R)
-        q = len(r)
-        r = np.array(r).reshape(q, 1)
+        R, r = _parse_hypothesis(hypothesis, self._x.columns)
 
         result = math.calc_F(R, r, self._beta_raw, self._var_beta_raw,
                              self._nobs, self.df)
@@ -304,21 +284,19 @@ class OLS(object):
         """
         Returns the raw covariance of beta.
         """
-        x = self._x.values
-        y = self._y_raw
-
-        xx = np.dot(x.T, x)
+        # (X'X)^-1, as already computed by the statsmodels fit from the
+        # pseudo-inverse of X rather than by inverting X'X
+        xx_inv = self.sm_ols.normalized_cov_params
 
         if self._nw_lags is None:
-            return math.inv(xx) * (self._rmse_raw ** 2)
+            return xx_inv * (self._rmse_raw ** 2)
         else:
-            resid = y - np.dot(x, self._beta_raw)
-            m = (x.T * resid).T
+            x = self._x_raw
+            m = x * self._resid_raw[:, np.newaxis]
 
             xeps = math.newey_west(m, self._nw_lags, self._nobs, self._df_raw,
                                    self._nw_overlap)
 
-            xx_inv = math.inv(xx)
             return np.dot(xx_inv, np.dot(xeps, xx_inv))
 
     @cache_readonly
@@ -630,14 +608,19 @@ class MovingOLS(OLS):
     @cache_readonly
     def var_beta(self):
         """Returns the covariance of beta."""
-        result = {}
-        result_index = self._result_index
-        for i in xrange(len(self._var_beta_raw)):
-            dm = DataMatrix(self._var_beta_raw[i], columns=self.beta.cols(),
-                            index=self.beta.cols())
-            result[result_index[i]] = dm
+        cols = list(self.beta.cols())
+        values = self._var_beta_raw
 
-        return WidePanel.fromDict(result, intersect=False)
+        # Build the panel straight from the stacked matrices instead of
+        # going through a dict of DataMatrix, one per date. Like
+        # WidePanel.fromDict, the minor axis comes out sorted
+        minor_axis = sorted(cols)
+        if minor_axis != cols:
+            indexer = [cols.index(c) for c in minor_axis]
+            values = values.take(indexer, axis=2)
+
+        return WidePanel(np.array(values, dtype=float), self._result_index,
+                         Index(cols), minor_axis)
 
     @cache_readonly
     def y_fitted(self):
@@ -658,12 +641,35 @@ class MovingOLS(OLS):
     def _is_rolling(self):
         return self._window_type == common.ROLLING
 
+    @cache_readonly
+    def _x_values(self):
+        """
+        Values of x, materialized once and C-contiguous for the per-date
+        loops and BLAS products
+        """
+        return np.ascontiguousarray(self._x.values)
+
+    @cache_readonly
+    def _y_values(self):
+        """Values of y, materialized once for the per-date loops."""
+        return _y_converter(self._y)
+
+    @cache_readonly
+    def _window_starts(self):
+        """
+        Position of the first date in the window ending at each date,
+        resolved once for the window type
+        """
+        N = len(self._index)
+        starts = np.zeros(N, dtype=int)
+        if self._is_rolling and N > self._window:
+            starts[self._window:] = np.arange(1, N - self._window + 1)
+        return starts
+
     @cache_readonly
     def _beta_raw(self):
         """Runs the regression and returns the beta."""
-        beta, indices, mask = self._rolling_ols_call
-
-        return beta[indices]
+        return self._rolling_ols_call[0]
 
     @cache_readonly
     def _result_index(self):
@@ -678,120 +684,157 @@ class MovingOLS(OLS):
         return self._calc_betas(self._x_trans, self._y_trans)
 
     def _calc_betas(self, x, y):
+        """
+        Returns the betas of the dates that could be fit, their positions
+        in the dates and a boolean mask of those positions
+        """
         N = len(self._index)
         K = len(self._x.cols())
 
-        betas = np.empty((N, K), dtype=float)
-        betas[:] = np.NaN
+        # Only the dates with data and enough observations get a fit
+        to_fit = np.arange(N)[self._time_has_obs & self._enough_obs]
 
-        valid = self._time_has_obs
-        enough = self._enough_obs
-        window = self._window
+        betas = np.empty((len(to_fit), K), dtype=float)
 
         # Use transformed (demeaned) Y, X variables
-        cum_xx = self._cum_xx(x)
-        cum_xy = self._cum_xy(x, y)
+        if x is self._x_trans and y is self._y_trans:
+            cum_xx, cum_xy = self._cum_xx_xy_trans
+        else:
+            cum_xx, cum_xy = self._cum_xx_xy(x, y)
 
-        for i in xrange(N):
-            if not valid[i] or not enough[i]:
-                continue
+        xx = self._window_sums(cum_xx, to_fit)
+        xy = self._window_sums(cum_xy, to_fit)
 
-            xx = cum_xx[i]
-            xy = cum_xy[i]
-            if self._is_rolling and i >= window:
-                xx = xx - cum_xx[i - window]
-                xy = xy - cum_xy[i - window]
+        for n in xrange(len(to_fit)):
+            betas[n] = math.solve(xx[n], xy[n])
 
-            betas[i] = math.solve(xx, xy)
+        # drop any fits that came out NaN
+        solved = -np.isnan(betas).any(axis=1)
+        if not solved.all():
+            betas = betas[solved]
+            to_fit = to_fit[solved]
 
-        mask = -np.isnan(betas).any(axis=1)
-        have_betas = np.arange(N)[mask]
+        mask = np.zeros(N, dtype=bool)
+        mask[to_fit] = True
 
-        return betas, have_betas, mask
+        return betas, to_fit, mask
 
-    def _rolling_rank(self):
-        dates = self._index
-        window = self._window
+    def _window_sums(self, cum, indices):
+        """
+        Returns the sums over the window ending at each of the given date
+        positions, taken from running sums down the dates
+        """
+        starts = self._window_starts[indices]
 
-        ranks = np.empty(len(dates), dtype=float)
-        ranks[:] = np.NaN
-        for i, date in enumerate(dates):
-            if self._is_rolling and i >= window:
-                prior_date = dates[i - window + 1]
-            else:
-                prior_date = dates[0]
+        sums = cum[indices]
+        prior = starts > 0
+        sums[prior] -= cum[starts[prior] - 1]
 
-            x_slice = self._x.truncate(before=prior_date, after=date).values
+        return sums
 
-            if len(x_slice) == 0:
-                continue
+    def _window_bounds(self, data, indices=None):
+        """
+        Returns the (left, right) row bounds in data of the window ending
+        at each date, or at the dates at the given positions, so that each
+        window can be taken as a view of the stacked values of data
+        """
+        dates = np.asarray(self._index)
+        starts = self._window_starts
 
-            ranks[i] = math.rank(x_slice)
+        if indices is not None:
+            dates = dates[indices]
+            starts = starts[indices]
 
-        return ranks
+        if isinstance(data, LongPanel):
+            get_bounds = data.index.get_major_bounds
+            return [get_bounds(self._index[start], date)
+                    for start, date in izip(starts, dates)]
 
-    def _cum_xx(self, x):
-        dates = self._index
-        K = len(x.cols())
-        valid = self._time_has_obs
-        cum_xx = []
+        index = np.asarray(data.index)
+        lefts = index.searchsorted(np.asarray(self._index)[starts],
+                                   side='left')
+        rights = index.searchsorted(dates, side='right')
 
-        if isinstance(x, DataFrame):
-            _indexMap = x.index.indexMap
-            def slicer(df, dt):
-                i = _indexMap[dt]
-                return df.values[i:i+1, :]
-        else:
-            slicer = lambda df, dt: df.truncate(dt, dt).values
+        return zip(lefts, rights)
+
+    def _rolling_rank(self):
+        values = self._x_values
+        K = values.shape[1]
 
-        last = np.zeros((K, K))
-        for i, date in enumerate(dates):
-            if not valid[i]:
-                cum_xx.append(last)
+        ranks = np.empty(len(self._index), dtype=float)
+        ranks[:] = np.NaN
+        for i, (left, right) in enumerate(self._window_bounds(self._x)):
+            if right <= left:
                 continue
 
-            x_slice = slicer(x, date)
-            xx = last = last + np.dot(x_slice.T, x_slice)
-            cum_xx.append(xx)
+            ranks[i] = math.rank(values[left : right])
 
-        return cum_xx
+            # an expanding window only gains rows, so once it has full
+            # rank every later window does too
+            if not self._is_rolling and ranks[i] == K:
+                ranks[i:] = K
+                break
 
-    def _cum_xy(self, x, y):
-        dates = self._index
-        valid = self._time_has_obs
-        cum_xy = []
+        return ranks
 
-        if isinstance(x, DataFrame):
-            _x_indexMap = x.index.indexMap
-            def x_slicer(df, dt):
-                i = _x_indexMap[dt]
-                return df.values[i:i+1, :]
-        else:
-            x_slicer = lambda df, dt: df.truncate(dt, dt).values
+    @cache_readonly
+    def _cum_xx_xy_trans(self):
+        """
+        Running X'X and X'y sums of the transformed variables, shared by
+        the beta solve and the covariance of beta
+        """
+        return self._cum_xx_xy(self._x_trans, self._y_trans)
 
+    @property
+    def _cum_xx_trans(self):
+        return self._cum_xx_xy_trans[0]
 
-        if isinstance(y, Series):
-            _y_indexMap = y.index.indexMap
-            _values = y.values
-            def y_slicer(df, dt):
-                i = _y_indexMap[dt]
-                return _values[i:i+1]
+    def _cum_xx_xy(self, x, y=None):
+        """
+        Running sums down the dates of X'X and, if y is given, X'y, built
+        in one pass over the rows of x. Returns (cum_xx, cum_xy), cum_xy
+        being None when y is not given
+        """
+        dates = self._index
+        K = len(x.cols())
+        valid = self._time_has_obs
+        values = x.values
+
+        # Sums of each date, left at zero where there are no observations,
+        # then run down the dates. These stay float64: a rolling window's
+        # sum is the difference of two running totals, which in float32
+        # would keep only a few significant digits on long samples
+        xx = np.zeros((len(dates), K, K))
+        if y is not None:
+            y_values = _y_converter(y)
+            xy = np.zeros((len(dates), K))
+
+        if isinstance(x, LongPanel) or isinstance(y, LongPanel):
+            x_slicer = _date_slicer(x, values)
+            if y is not None:
+                y_slicer = _date_slicer(y, y_values)
+
+            for i in np.arange(len(dates))[valid]:
+                x_slice = x_slicer(dates[i])
+                xx[i] = np.dot(x_slice.T, x_slice)
+                if y is not None:
+                    xy[i] = np.dot(x_slice.T, y_slicer(dates[i]))
         else:
-            y_slicer = lambda s, dt: _y_converter(s.truncate(dt, dt))
-
-        last = np.zeros(len(x.cols()))
-        for i, date in enumerate(dates):
-            if not valid[i]:
-                cum_xy.append(last)
-                continue
+            # one row per date, all outer products at once
+            valid_dates = dates[valid]
+            rows = values[_date_rows(x, valid_dates)]
+            xx[valid] = rows[:, :, None] * rows[:, None, :]
+            if y is not None:
+                y_rows = y_values[_date_rows(y, valid_dates)]
+                xy[valid] = rows * y_rows[:, None]
 
-            x_slice = x_slicer(x, date)
-            y_slice = y_slicer(y, date)
+        # accumulate in place, the per-date sums are not needed afterwards
+        xx.cumsum(0, out=xx)
+        if y is None:
+            return xx, None
 
-            xy = last = last + np.dot(x_slice.T, y_slice)
-            cum_xy.append(xy)
-
-        return cum_xy
+        xy.cumsum(0, out=xy)
+        return xx, xy
 
     @cache_readonly
     def _rank_raw(self):
@@ -831,13 +874,11 @@ class MovingOLS(OLS):
             if 'intercept' in items:
                 q -= 1
 
-            def get_result_simple(Fst, d):
-                return Fst, (q, d), 1 - f.cdf(Fst, q, d)
-
-            # Compute the P-value for each pair
-            result = starmap(get_result_simple, izip(F, df_resid))
+            # Compute the P-values in one call, then pair them up
+            p_values = 1 - f.cdf(F, q, df_resid)
 
-            return list(result)
+            return [(Fst, (q, d), p)
+                    for Fst, d, p in izip(F, df_resid, p_values)]
 
         K = len(items)
         R = np.eye(K)
@@ -849,24 +890,43 @@ class MovingOLS(OLS):
             R = np.concatenate((R[0 : intercept], R[intercept + 1:]))
             r = np.concatenate((r[0 : intercept], r[intercept + 1:]))
 
-        def get_result(beta, vcov, n, d):
-            return math.calc_F(R, r, beta, vcov, n, d)
+        q = len(r)
+
+        F = np.array([math.calc_F_stat(R, r, beta, vcov)
+                      for beta, vcov in izip(self._beta_raw,
+                                             self._var_beta_raw)])
 
-        results = starmap(get_result,
-                          izip(self._beta_raw, self._var_beta_raw, nobs, df))
+        p_values = 1 - f.cdf(F, q, df_resid)
 
-        return list(results)
+        return [(Fst, (q, d), p)
+                for Fst, d, p in izip(F, df_resid, p_values)]
 
     @cache_readonly
-    def _p_value_raw(self):
-        """Returns the raw p values."""
+    def _coef_stats(self):
+        """
+        Standard errors, t-stats and p values of the betas, computed
+        together from one read of the covariance diagonals
+        """
         from scipy.stats import t
 
-        result = [2 * t.sf(a, b)
-                  for a, b in izip(np.fabs(self._t_stat_raw),
-                                   self._df_resid_raw)]
+        std_err = np.sqrt(np.diagonal(self._var_beta_raw, axis1=1, axis2=2))
+        t_stat = self._beta_raw / std_err
 
-        return np.array(result)
+        # one call, broadcasting the per-date df across the coefficients
+        df_resid = np.asarray(self._df_resid_raw)[:, np.newaxis]
+        p_value = t.sf(np.fabs(t_stat), df_resid)
+        p_value *= 2
+
+        return {
+            'std_err' : std_err,
+            't_stat' : t_stat,
+            'p_value' : p_value,
+        }
+
+    @cache_readonly
+    def _p_value_raw(self):
+        """Returns the raw p values."""
+        return self._coef_stats['p_value']
 
     @cache_readonly
     def _resid_stats(self):
@@ -874,22 +934,17 @@ class MovingOLS(OLS):
         sst = []
         sse = []
 
-        Y = self._y
-        X = self._x
+        X_values = self._x_values
+        Y_values = self._y_values
 
-        dates = self._index
-        window = self._window
-        for n, index in enumerate(self._valid_indices):
-            if self._is_rolling and index >= window:
-                prior_date = dates[index - window + 1]
-            else:
-                prior_date = dates[0]
+        x_bounds = self._window_bounds(self._x, self._valid_indices)
+        y_bounds = self._window_bounds(self._y, self._valid_indices)
 
-            date = dates[index]
+        for n, (x_bound, y_bound) in enumerate(izip(x_bounds, y_bounds)):
             beta = self._beta_raw[n]
 
-            X_slice = X.truncate(before=prior_date, after=date).values
-            Y_slice = _y_converter(Y.truncate(before=prior_date, after=date))
+            X_slice = X_values[x_bound[0] : x_bound[1]]
+            Y_slice = Y_values[y_bound[0] : y_bound[1]]
 
             resid = Y_slice - np.dot(X_slice, beta)
 
@@ -936,132 +991,152 @@ class MovingOLS(OLS):
     @cache_readonly
     def _std_err_raw(self):
         """Returns the raw standard err values."""
-        results = []
-        for i in xrange(len(self._var_beta_raw)):
-            results.append(np.sqrt(np.diag(self._var_beta_raw[i])))
-
-        return np.array(results)
+        return self._coef_stats['std_err']
 
     @cache_readonly
     def _t_stat_raw(self):
         """Returns the raw t-stat value."""
-        return self._beta_raw / self._std_err_raw
+        return self._coef_stats['t_stat']
 
     @cache_readonly
     def _var_beta_raw(self):
         """Returns the raw covariance of beta."""
-        x = self._x
-        y = self._y
-        dates = self._index
         nobs = self._nobs
         rmse = self._rmse_raw
         beta = self._beta_raw
         df = self._df_raw
-        window = self._window
-        cum_xx = self._cum_xx(self._x)
+        cum_xx = self._cum_xx_trans
 
-        results = []
-        for n, i in enumerate(self._valid_indices):
-            xx = cum_xx[i]
-            date = dates[i]
+        # the windows themselves are only needed for Newey-West
+        if self._nw_lags is not None:
+            x_values = self._x_values
+            y_values = self._y_values
+            x_bounds = self._window_bounds(self._x, self._valid_indices)
+            y_bounds = self._window_bounds(self._y, self._valid_indices)
 
-            if self._is_rolling and i >= window:
-                xx = xx - cum_xx[i - window]
-                prior_date = dates[i - window + 1]
-            else:
-                prior_date = dates[0]
+        # each window's X'X is replaced by its covariance in place
+        results = self._window_sums(cum_xx, self._valid_indices)
 
-            x_slice = x.truncate(before=prior_date, after=date)
-            y_slice = y.truncate(before=prior_date, after=date)
-            xv = x_slice.values
-            yv = np.asarray(y_slice)
+        for n in xrange(len(results)):
+            xx = results[n]
 
             if self._nw_lags is None:
                 result = math.inv(xx) * (rmse[n] ** 2)
             else:
-                resid = yv - np.dot(xv, beta[n])
-                m = (xv.T * resid).T
+                xv = x_values[x_bounds[n][0] : x_bounds[n][1]]
+                yv = y_values[y_bounds[n][0] : y_bounds[n][1]]
 
-                xeps = math.newey_west(m, self._nw_lags, nobs[n], df[n],
-                                       self._nw_overlap)
+                result = _nw_var_beta(xv, yv, beta[n], xx, self._nw_lags,
+                                      nobs[n], df[n], self._nw_overlap)
 
-                xx_inv = math.inv(xx)
-                result = np.dot(xx_inv, np.dot(xeps, xx_inv))
+            results[n] = result
 
-            results.append(result)
-
-        return np.array(results)
+        return results
 
     @cache_readonly
     def _forecast_mean_raw(self):
         """Returns the raw covariance of beta."""
         nobs = self._nobs
-        window = self._window
 
         # x should be ones
         dummy = DataMatrix(index=self._y.index)
         dummy['y'] = 1
 
-        cum_xy = self._cum_xy(dummy, self._y)
-
-        results = []
-        for n, i in enumerate(self._valid_indices):
-            sumy = cum_xy[i]
-
-            if self._is_rolling and i >= window:
-                sumy = sumy - cum_xy[i - window]
+        _, cum_xy = self._cum_xx_xy(dummy, self._y)
 
-            results.append(sumy[0] / nobs[n])
+        sumy = self._window_sums(cum_xy, self._valid_indices)[:, 0]
 
-        return np.array(results)
+        return sumy / nobs
 
     @cache_readonly
     def _forecast_vol_raw(self):
         """Returns the raw covariance of beta."""
         beta = self._beta_raw
-        window = self._window
-        dates = self._index
-        x = self._x
+        x_values = self._x_values
+        bounds = self._window_bounds(self._x, self._valid_indices)
+
+        M = len(bounds)
+        results = np.empty(M)
+        if M == 0:
+            return results
+
+        lefts, rights = np.array(bounds, dtype=int).T
+
+        # B' cov(X) B is the sample variance of X B, so project the windows
+        # onto their betas instead of forming covariance matrices. The
+        # variance is taken in two passes on purpose: sliding sums of x and
+        # xx' would cancel badly on trending regressors.
+        #
+        # A block of dates is projected with one product over the rows its
+        # windows span, masking each column down to its own window. Each
+        # block is the longest run of dates whose product, rows spanned
+        # times dates, fits in _FORECAST_BLOCK values. Every date adds at
+        # least one row, so no block is longer than the square root of that
+        maxBlock = int(np.sqrt(_FORECAST_BLOCK))
+
+        start = 0
+        while start < M:
+            left = np.minimum.accumulate(lefts[start : start + maxBlock])
+            right = np.maximum.accumulate(rights[start : start + maxBlock])
+            sizes = (right - left) * np.arange(1, len(left) + 1)
+            block = (sizes <= _FORECAST_BLOCK).sum()
+
+            if block < min(_FORECAST_MIN_BLOCK, len(left)):
+                end = min(start + _FORECAST_MIN_BLOCK, M)
+                for n in xrange(start, end):
+                    z = np.dot(x_values[lefts[n] : rights[n]], beta[n])
+                    z -= z.mean()
+
+                    results[n] = np.sqrt(np.dot(z, z) / (len(z) - 1))
+
+                start = end
+                continue
 
-        results = []
-        for n, i in enumerate(self._valid_indices):
-            date = dates[i]
-            if self._is_rolling and i >= window:
-                prior_date = dates[i - window + 1]
-            else:
-                prior_date = dates[0]
+            end = start + block
+            left, right = lefts[start:end], rights[start:end]
+            lo, hi = left.min(), right.max()
+
+            z = np.dot(x_values[lo : hi], beta[start:end].T)
 
-            x_slice = x.truncate(prior_date, date).values
-            x_demeaned = x_slice - x_slice.mean(0)
-            x_cov = np.dot(x_demeaned.T, x_demeaned) / (len(x_slice) - 1)
+            rows = np.arange(lo, hi)[:, np.newaxis]
+            in_window = (rows >= left) & (rows < right)
+            count = in_window.sum(0)
 
-            B = beta[n]
-            result = np.dot(B, np.dot(x_cov, B))
-            results.append(np.sqrt(result))
+            # everything in place, so a block is only ever one z in size
+            z *= in_window
+            mean = z.sum(0) / count
+            z -= mean
+            z *= in_window
+            z *= z
 
-        return np.array(results)
+            results[start:end] = np.sqrt(z.sum(0) / (count - 1))
+            start = end
+
+        return results
 
     @cache_readonly
     def _y_fitted_raw(self):
         """Returns the raw fitted y values."""
-        return (self._x.values * self._beta_matrix(lag=0)).sum(1)
+        return _row_dot(self._x_values, self._beta_matrix(lag=0))
 
     @cache_readonly
     def _y_predict_raw(self):
         """Returns the raw predicted y values."""
-        return (self._x.values * self._beta_matrix(lag=1)).sum(1)
+        return _row_dot(self._x_values, self._beta_matrix(lag=1))
 
     @cache_readonly
     def _results(self):
+        last_date = self.beta.index[-1]
+
         results = {}
         for result in self.RESULT_FIELDS:
             value = getattr(self, result)
             if isinstance(value, np.ndarray):
                 value = value[-1]
             elif isinstance(value, Series):
-                value = value[self.beta.index[-1]]
+                value = value[last_date]
             elif isinstance(value, DataFrame):
-                value = value.getXS(self.beta.index[-1])
+                value = value.getXS(last_date)
             else:
                 raise Exception('Problem retrieving %s' % result)
             results[result] = value
@@ -1070,11 +1145,7 @@ class MovingOLS(OLS):
 
     @cache_readonly
     def _window_time_obs(self):
-        window_obs = moments._rolling_sum(self._time_obs_count > 0,
-                                          self._window, minp=1)
-
-        window_obs[np.isnan(window_obs)] = 0
-        return window_obs.astype(int)
+        return _trailing_sums(self._time_obs_count > 0, self._window)
 
     @cache_readonly
     def _nobs_raw(self):
@@ -1084,10 +1155,7 @@ class MovingOLS(OLS):
             # expanding case
             window = len(self._index)
 
-        result = moments._rolling_sum(self._time_obs_count, window,
-                                      minp=1)
-
-        return result.astype(int)
+        return _trailing_sums(self._time_obs_count, window)
 
     def _beta_matrix(self, lag=0):
         assert(lag >= 0)
@@ -1095,8 +1163,12 @@ class MovingOLS(OLS):
         labels = np.arange(len(self._y)) - lag
         indexer = self._valid_obs_labels.searchsorted(labels, side='left')
 
-        beta_matrix = self._beta_raw[indexer]
-        beta_matrix[labels < self._valid_obs_labels[0]] = np.NaN
+        beta_matrix = self._beta_raw.take(indexer, axis=0)
+
+        # the labels are increasing, so the rows before the first fit
+        # are a leading block
+        before_first = max(self._valid_obs_labels[0] + lag, 0)
+        beta_matrix[:before_first] = np.NaN
 
         return beta_matrix
 
@@ -1123,11 +1195,12 @@ def _safe_update(d, other):
     """
     Combine dictionaries with non-overlapping keys
     """
-    for k, v in other.iteritems():
-        if k in d:
-            raise Exception('Duplicate regressor: %s' % k)
+    duplicates = set(d).intersection(other)
+    if duplicates:
+        raise Exception('Duplicate regressor: %s' % duplicates.pop())
 
-        d[k] = v
+    # other may be a DataFrame, which has iteritems but no keys
+    d.update(other.iteritems())
 
 def _combine_rhs(rhs):
     """
@@ -1177,7 +1250,7 @@ def _filter_data(lhs, rhs):
 
     rhs = _combine_rhs(rhs)
 
-    rhs_valid = np.isfinite(rhs.values).sum(1) == len(rhs.columns)
+    rhs_valid = np.isfinite(rhs.values).all(1)
 
     if not rhs_valid.all():
         pre_filtered_rhs = rhs[rhs_valid]
@@ -1189,10 +1262,9 @@ def _filter_data(lhs, rhs):
         rhs = rhs.reindex(index)
         lhs = lhs.reindex(index)
 
-        rhs_valid = np.isfinite(rhs.values).sum(1) == len(rhs.columns)
+        rhs_valid = np.isfinite(rhs.values).all(1)
 
-    lhs_valid = np.isfinite(lhs.values)
-    valid = rhs_valid & lhs_valid
+    valid = rhs_valid & np.isfinite(lhs.values)
 
     if not valid.all():
         filt_index = rhs.index[valid]
@@ -1203,6 +1275,110 @@ def _filter_data(lhs, rhs):
 
     return filtered_lhs, filtered_rhs, pre_filtered_rhs, index, valid
 
+def _trailing_sums(counts, window):
+    """
+    Sums of the counts over the trailing window ending at each position,
+    fewer at the start, from a running integer sum
+    """
+    cum_counts = np.asarray(counts, dtype=int).cumsum()
+
+    result = cum_counts.copy()
+    result[window:] -= cum_counts[:-window]
+
+    return result
+
+def _nw_var_beta(x, y, beta, xx, nw_lags, nobs, df, nw_overlap):
+    """
+    Returns the Newey-West adjusted covariance of beta, given the x and y
+    values the regression was run on and their X'X
+    """
+    resid = y - np.dot(x, beta)
+    m = x * resid[:, np.newaxis]
+
+    xeps = math.newey_west(m, nw_lags, nobs, df, nw_overlap)
+
+    return math.inv_sandwich(xx, xeps)
+
+def _row_dot(x, betas):
+    """
+    Returns the dot product of each row of x with the same row of betas.
+    betas, a fresh array from _beta_matrix, is overwritten with the
+    products rather than allocating another array of the same size
+    """
+    betas *= x
+    return betas.sum(1)
+
+def _parse_hypothesis(hypothesis, x_names):
+    """
+    Returns the restriction matrix R and vector r of the equations in
+    hypothesis, as taken by OLS.f_test
+
+    Parameters
+    ----------
+    hypothesis : string or list of strings
+    x_names : Index
+    """
+    if isinstance(hypothesis, str):
+        eqs = hypothesis.split(',')
+    elif isinstance(hypothesis, list):
+        eqs = hypothesis
+    else:
+        raise Exception('hypothesis must be either string or list')
+
+    indexMap = x_names.indexMap
+
+    q = len(eqs)
+    R = np.zeros((q, len(x_names)))
+    r = np.zeros((q, 1))
+
+    for i, equation in enumerate(eqs):
+        lhs, rhs = equation.split('=')
+        for s in lhs.split('+'):
+            ss = s.split('*')
+            R[i, indexMap[ss[1]]] = float(ss[0])
+
+        r[i] = float(rhs)
+
+    return R, r
+
+def _date_slicer(data, values):
+    """
+    Returns a function mapping a date to the rows of values observed on
+    that date. values should be the stacked values of data, materialized
+    once, so that each lookup is a view rather than a new object
+
+    Parameters
+    ----------
+    data : Series, DataFrame or LongPanel
+    values : ndarray
+    """
+    if isinstance(data, LongPanel):
+        get_bounds = data.index.get_major_bounds
+        def slicer(dt):
+            left, right = get_bounds(dt, dt)
+            return values[left : right]
+    else:
+        indexMap = data.index.indexMap
+        def slicer(dt):
+            i = indexMap[dt]
+            return values[i : i + 1]
+
+    return slicer
+
+def _date_rows(data, dates):
+    """
+    Returns the positions of the given dates in the index of data, which
+    has one row per date
+    """
+    index = data.index
+
+    # the filtered data usually has a row for exactly these dates
+    if len(index) == len(dates) and index.equals(dates):
+        return np.arange(len(dates))
+
+    indexMap = index.indexMap
+    return np.array([indexMap[dt] for dt in dates], dtype=int)
+
 # A little kludge so we can use this method for both
 # MovingOLS and MovingPanelOLS
 def _y_converter(y):
@@ -14,6 +14,7 @@ from pandas.core.panel import WidePanel, LongPanel
 from pandas.core.matrix import DataFrame, DataMatrix
 from pandas.core.series import Series
 from pandas.stats.ols import OLS, MovingOLS
+from pandas.stats.ols import _nw_var_beta, _parse_hypothesis, _row_dot
 from pandas.util.decorators import cache_readonly
 import pandas.stats.common as common
 import pandas.stats.math as math
@@ -414,7 +415,7 @@ class PanelOLS(OLS):
         if self._time_effects:
             xx = _xx_time_effects(x, y)
         else:
-            xx = np.dot(x.values.T, x.values)
+            xx = math.xtx(x.values)
 
         return _var_beta_panel(y, x, self._beta_raw, xx,
                                self._rmse_raw, cluster_axis, self._nw_lags,
@@ -447,34 +448,7 @@ class PanelOLS(OLS):
         o.f_test(['1*x1+2*x2=0','1*x3=0'])
         """
 
-        x_names = self._x.items
-
-        R = []
-        r = []
-
-        if isinstance(hypothesis, str):
-            eqs = hypothesis.split(',')
-        elif isinstance(hypothesis, list):
-            eqs = hypothesis
-        else:
-            raise Exception('hypothesis must be either string or list')
-        for equation in eqs:
-            row = np.zeros(len(x_names))
-            lhs, rhs = equation.split('=')
-            for s in lhs.split('+'):
-                ss = s.split('*')
-                coeff = float(ss[0])
-                x_name = ss[1]
-                idx = x_names.indexMap[x_name]
-                row[idx] = coeff
-            rhs = float(rhs)
-
-            R.append(row)
-            r.append(rhs)
-
-        R = np.array(R)
-        q = len(r)
-        r = np.array(r).reshape(q, 1)
+        R, r = _parse_hypothesis(hypothesis, self._x.items)
 
         result = math.calc_F(R, r, self._beta_raw, self._var_beta_raw,
                              self._nobs, self.df)
@@ -656,9 +630,8 @@ class MovingPanelOLS(MovingOLS, PanelOLS):
         -------
         DataMatrix
         """
-        x = self._x.values
         betas = self._beta_matrix(lag=lag)
-        return self._unstack_y((betas * x).sum(1))
+        return self._unstack_y(_row_dot(self._x_values, betas))
 
     @cache_readonly
     def _rolling_ols_call(self):
@@ -692,61 +665,71 @@ class MovingPanelOLS(MovingOLS, PanelOLS):
         rmse = self._rmse_raw
         beta = self._beta_raw
         df = self._df_raw
-        window = self._window
+        starts = self._window_starts
 
         if not self._time_effects:
-            # Non-transformed X
-            cum_xx = self._cum_xx(x)
-
-        results = []
-        for n, i in enumerate(self._valid_indices):
-            if self._is_rolling and i >= window:
-                prior_date = dates[i - window + 1]
+            # Non-transformed X, already summed for the betas unless
+            # the regression ran on weighted data
+            if x is self._x_trans:
+                cum_xx = self._cum_xx_trans
             else:
-                prior_date = dates[0]
+                cum_xx, _ = self._cum_xx_xy(x)
 
-            date = dates[i]
+            window_xx = self._window_sums(cum_xx, self._valid_indices)
 
-            x_slice = x.truncate(prior_date, date)
-            y_slice = y.truncate(prior_date, date)
+        # Time effects and clustering work on the window as a LongPanel.
+        # Otherwise the plain covariance needs only X'X, and Newey-West
+        # only views of the window's values
+        need_panels = self._time_effects or cluster_axis is not None
+        if self._nw_lags is not None and not need_panels:
+            x_values = self._x_values
+            y_values = self._y_values
+            bounds = self._window_bounds(x, self._valid_indices)
+
+        x_slice = y_slice = None
+
+        K = beta.shape[1]
+        results = np.empty((len(self._valid_indices), K, K))
+        for n, i in enumerate(self._valid_indices):
+            if need_panels:
+                prior_date = dates[starts[i]]
+                date = dates[i]
+
+                x_slice = x.truncate(prior_date, date)
+                y_slice = y.truncate(prior_date, date)
 
             if self._time_effects:
                 xx = _xx_time_effects(x_slice, y_slice)
             else:
-                xx = cum_xx[i]
-                if self._is_rolling and i >= window:
-                    xx = xx - cum_xx[i - window]
+                xx = window_xx[n]
 
-            result = _var_beta_panel(y_slice, x_slice, beta[n], xx, rmse[n],
-                                    cluster_axis, self._nw_lags,
-                                    nobs[n], df[n], self._nw_overlap)
+            if need_panels or self._nw_lags is None:
+                result = _var_beta_panel(y_slice, x_slice, beta[n], xx,
+                                         rmse[n], cluster_axis, self._nw_lags,
+                                         nobs[n], df[n], self._nw_overlap)
+            else:
+                left, right = bounds[n]
+                result = _nw_var_beta(x_values[left : right],
+                                      y_values[left : right], beta[n], xx,
+                                      self._nw_lags, nobs[n], df[n],
+                                      self._nw_overlap)
 
-            results.append(result)
+            results[n] = result
 
-        return np.array(results)
+        return results
 
     @cache_readonly
     def _resid_raw(self):
-        beta_matrix = self._beta_matrix(lag=0)
-
-        Y = self._y.values.squeeze()
-        X = self._x.values
-        resid = Y - (X * beta_matrix).sum(1)
-
-        return resid
+        return self._y_values - self._y_fitted_raw
 
     @cache_readonly
     def _y_fitted_raw(self):
-        x = self._x.values
-        betas = self._beta_matrix(lag=0)
-        return (betas * x).sum(1)
+        return _row_dot(self._x_values, self._beta_matrix(lag=0))
 
     @cache_readonly
     def _y_predict_raw(self):
         """Returns the raw predicted y values."""
-        x = self._x.values
-        betas = self._beta_matrix(lag=1)
-        return (betas * x).sum(1)
+        return _row_dot(self._x_values, self._beta_matrix(lag=1))
 
     def _beta_matrix(self, lag=0):
         assert(lag >= 0)
@@ -754,7 +737,7 @@ class MovingPanelOLS(MovingOLS, PanelOLS):
         labels = self._y_trans.index.major_labels - lag
         indexer = self._valid_indices.searchsorted(labels, side='left')
 
-        beta_matrix = self._beta_raw[indexer]
+        beta_matrix = self._beta_raw.take(indexer, axis=0)
         beta_matrix[labels < self._valid_indices[0]] = np.NaN
 
         return beta_matrix
@@ -858,18 +841,12 @@ def _var_beta_panel(y, x, beta, xx, rmse, cluster_axis,
 
     from pandas.core.panel import LongPanel, group_agg
 
-    xx_inv = math.inv(xx)
-
     if cluster_axis is None:
         if nw_lags is None:
-            return xx_inv * (rmse ** 2)
+            return math.inv(xx) * (rmse ** 2)
         else:
-            resid = y.values.squeeze() - np.dot(x.values, beta)
-            m = (x.values.T * resid).T
-
-            xeps = math.newey_west(m, nw_lags, nobs, df, nw_overlap)
-
-            return np.dot(xx_inv, np.dot(xeps, xx_inv))
+            return _nw_var_beta(x.values, y.values.squeeze(), beta, xx,
+                                nw_lags, nobs, df, nw_overlap)
     else:
         Xb = np.dot(x.values, beta).reshape((len(x.values), 1))
         resid = LongPanel(y.values - Xb, ['resid'], y.index)
@@ -881,22 +858,18 @@ def _var_beta_panel(y, x, beta, xx, rmse, cluster_axis,
         m = group_agg(x.values * resid.values, x.index._bounds,
                       lambda x: np.sum(x, axis=0))
 
-        if nw_lags is None:
-            nw_lags = 0
-
-        xox = 0
-        for i in range(len(x.major_axis)):
-            xox += math.newey_west(m[i : i + 1], nw_lags,
-                                   nobs, df, nw_overlap)
+        # Each cluster contributes a single row, which has no lagged
+        # terms, so the sum over clusters is the zero-lag estimate on m
+        xox = math.newey_west(m, 0, nobs, df)
 
-        return np.dot(xx_inv, np.dot(xox, xx_inv))
+        return math.inv_sandwich(xx, xox)
 
 def _xx_time_effects(x, y):
     """
     Returns X'X - (X'T) (T'T)^-1 (T'X)
     """
     # X'X
-    xx = np.dot(x.values.T, x.values)
+    xx = math.xtx(x.values)
     xt = x.sum('minor').values
 
     count = y.count()
@@ -1,5 +1,6 @@
 import numpy as np
 import pandas.stats.moments as moments
+from pandas.util.testing import makeTimeSeries
 
 def test_rolling_median():
     arr = np.random.randn(100)
@@ -16,3 +17,83 @@ def test_rolling_median():
     assert(np.isnan(result[20]))
 
     assert(result[-1] == np.median(arr[-49:]))
+
+def test_rolling_count():
+    arr = np.random.randn(20)
+    arr[5:8] = np.NaN
+
+    result = moments.rolling_count(arr, 4)
+    expected = [np.isfinite(arr[max(0, i - 3) : i + 1]).sum()
+                for i in range(len(arr))]
+    assert((result == expected).all())
+
+    # no observations fit in an empty window
+    result = moments.rolling_count(np.arange(5.), 0)
+    assert((result == 0).all())
+
+    # a window at least as long as the data counts everything so far
+    for window in (len(arr), len(arr) + 5):
+        result = moments.rolling_count(arr, window)
+        assert((result == np.isfinite(arr).cumsum()).all())
+
+def test_rolling_moments_offset():
+    # far from zero the kernels' running power sums cancel badly unless the
+    # data is centered first; check against a direct two-pass computation
+    arr = np.random.randn(200) + 1000
+    window = 20
+
+    var = moments.rolling_var(arr, window)
+    skew = moments.rolling_skew(arr, window)
+    kurt = moments.rolling_kurt(arr, window)
+
+    n = float(window)
+    for i in range(window - 1, len(arr)):
+        dev = arr[i - window + 1 : i + 1]
+        dev = dev - dev.mean()
+
+        m2 = (dev ** 2).mean()
+        m3 = (dev ** 3).mean()
+        m4 = (dev ** 4).mean()
+
+        expected_var = (dev ** 2).sum() / (n - 1)
+        expected_skew = np.sqrt(n * (n - 1)) * m3 / ((n - 2) * m2 ** 1.5)
+        expected_kurt = (((n * n - 1) * m4 / (m2 * m2) - 3 * (n - 1) ** 2)
+                         / ((n - 2) * (n - 3)))
+
+        assert(np.allclose(var[i], expected_var, rtol=1e-9, atol=0))
+        assert(np.allclose(skew[i], expected_skew, rtol=1e-7, atol=1e-9))
+        assert(np.allclose(kurt[i], expected_kurt, rtol=1e-7, atol=1e-9))
+
+def test_ewma_span():
+    arr = np.random.randn(50)
+
+    result = moments.ewma(arr, span=7)
+
+    # span 7 is a center of mass of 3, each value weighted 3 / 4 of the next
+    weights = 0.75 ** np.arange(len(arr))[::-1]
+    expected = [np.dot(weights[-i-1:], arr[:i+1]) / weights[-i-1:].sum()
+                for i in range(len(arr))]
+
+    assert(np.allclose(result, expected))
+    assert(np.allclose(result, moments.ewma(arr, com=3)))
+
+def test_ewm_fractional_com():
+    seriesA = makeTimeSeries()
+    seriesB = makeTimeSeries()
+
+    # minCom * com masks int(2.5) = 2 leading values
+    results = [moments.ewma(seriesA, com=2.5, minCom=1),
+               moments.ewmvar(seriesA, 2.5, minCom=1),
+               moments.ewmvol(seriesA, 2.5, minCom=1),
+               moments.ewmcov(seriesA, seriesB, 2.5, minCom=1),
+               moments.ewmcorr(seriesA, seriesB, 2.5, minCom=1)]
+
+    for result in results:
+        assert(len(result) == len(seriesA))
+        assert(np.isnan(result[:2]).all())
+        assert(np.isfinite(result[2:]).all())
+
+    # span 8 is a fractional center of mass, 3.5
+    result = moments.ewma(seriesA, span=8, minCom=1)
+    assert(np.isnan(result[:3]).all())
+    assert(np.isfinite(result[3:]).all())
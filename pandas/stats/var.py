@@ -7,7 +7,7 @@ from pandas.core.matrix import DataFrame, DataMatrix
 from pandas.core.panel import WidePanel
 from pandas.core.series import Series
 import pandas.stats.common as common
-from pandas.stats.math import chain_dot, inv
+from pandas.stats.math import chain_dot, inv, xtx
 from pandas.stats.ols import _combine_rhs
 
 class VAR(object):
@@ -285,7 +285,7 @@ BIC:                            %(bic).3f
 
         x = self._x
 
-        inv_cov_x = inv(np.dot(x.T, x))
+        inv_cov_x = inv(xtx(x))
 
         return np.kron(inv_cov_x, cov_resid)
 
@@ -384,8 +384,8 @@ BIC:                            %(bic).3f
         Returns the standard error of the forecasts
         at 1, 2, ..., n timesteps.
         """
-        return np.array([np.sqrt(np.diag(value))
-                         for value in self._forecast_cov_raw(h)])
+        cov = np.asarray(self._forecast_cov_raw(h))
+        return np.sqrt(np.diagonal(cov, axis1=1, axis2=2))
 
     @cache_readonly
     def _ic(self):
@@ -533,7 +533,7 @@ class PanelVAR(VAR):
         k = self._k
         resid = _drop_incomplete_rows(self.resid.toLong().values)
         n = len(resid)
-        return np.dot(resid.T, resid) / (n - k)
+        return xtx(resid) / (n - k)
 
 def _drop_incomplete_rows(array):
     mask = np.isfinite(array).all(1)